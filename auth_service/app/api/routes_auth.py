@@ -1,23 +1,57 @@
 """
 Authentication API routes
-Endpoints: /login, /register
+Endpoints: /login, /register, /refresh, /logout, /revoke, /revocations
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from datetime import timezone
+from typing import Optional
 
+from fastapi import APIRouter, BackgroundTasks, Cookie, Depends, HTTPException, Query, Request, Response, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.rate_limit import login_rate_limiter
+from app.core.refresh_tokens import issue_refresh_token, revoke_refresh_token, rotate_refresh_token
+from app.core.revocation import list_revocations, revoke_access_token
+from app.core.user_cache import get_login_user
 from app.core.tokens import generate_access_token
-from app.core.security import verify_password, get_password_hash
-from app.schemas.token import LoginRequest, TokenResponse, UserCreate, UserResponse
+from app.core.security import (
+    decode_access_token, get_password_hash_async, password_needs_rehash, rehash_password, verify_password_async
+)
+from app.schemas.token import (
+    LoginRequest, RefreshRequest, RevocationFeed, RevokeRequest, TokenResponse, UserCreate, UserResponse
+)
 from app.models.user import User
 from app.db.database import get_db
 
 router = APIRouter()
 
+# Access token (nếu có) trong header Authorization, dùng cho /logout
+bearer_scheme = HTTPBearer(auto_error=False)
+
+def _set_refresh_cookie(response: Response, refresh_token: str):
+    """Gửi refresh token trong cookie HttpOnly (chỉ gửi kèm các request tới /auth)"""
+    response.set_cookie(
+        key=settings.REFRESH_TOKEN_COOKIE_NAME,
+        value=refresh_token,
+        max_age=settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 3600,
+        path="/auth",
+        secure=settings.COOKIE_SECURE,
+        httponly=settings.COOKIE_HTTPONLY,
+        samesite=settings.COOKIE_SAMESITE,
+    )
+
+def _with_refresh_token(token_data: dict, refresh_token: str) -> dict:
+    token_data["refresh_token"] = refresh_token
+    token_data["refresh_expires_in"] = settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 3600
+    return token_data
+
 @router.post("/register", response_model=UserResponse)
 async def register(
     user_data: UserCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Register new user
@@ -27,7 +61,8 @@ async def register(
     - **password**: Mật khẩu
     """
     # Kiểm tra username đã tồn tại chưa
-    existing_user = db.query(User).filter(User.username == user_data.username).first()
+    result = await db.execute(select(User).where(User.username == user_data.username))
+    existing_user = result.scalars().first()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -35,7 +70,8 @@ async def register(
         )
     
     # Kiểm tra email đã tồn tại chưa
-    existing_email = db.query(User).filter(User.email == user_data.email).first()
+    result = await db.execute(select(User).where(User.email == user_data.email))
+    existing_email = result.scalars().first()
     if existing_email:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -43,7 +79,7 @@ async def register(
         )
     
     # Tạo user mới
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     new_user = User(
         username=user_data.username,
         email=user_data.email,
@@ -53,18 +89,21 @@ async def register(
     )
     
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     
     return new_user
 
 @router.post("/login", response_model=TokenResponse)
 async def login(
     login_data: LoginRequest,
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db)
 ):
     """
-    Login endpoint - xác thực user và trả về access token
+    Login endpoint - xác thực user và trả về access token + refresh token
     
     - **username**: Tên đăng nhập hoặc email
     - **password**: Mật khẩu
@@ -73,12 +112,16 @@ async def login(
     - **access_token**: JWT token (RS256 với RSA private key)
     - **token_type**: "bearer"
     - **expires_in**: Thời gian hết hạn (seconds)
+    - **refresh_token**: Token dùng cho /auth/refresh (cũng được set trong cookie)
+    
+    Trả 429 (kèm Retry-After) khi username hoặc IP thử login quá nhiều lần.
     """
+    # Rate limit trước khi query DB / verify bcrypt: request bị chặn không tốn CPU
+    await login_rate_limiter.check(request, login_data.username)
+    
     try:
-        # Tìm user theo username hoặc email
-        user = db.query(User).filter(
-            (User.username == login_data.username) | (User.email == login_data.username)
-        ).first()
+        # Tìm user theo username hoặc email (chỉ các cột cần cho login, có cache)
+        user = await get_login_user(db, login_data.username)
         
         if not user:
             raise HTTPException(
@@ -96,7 +139,9 @@ async def login(
         
         # Verify password
         try:
-            password_valid = verify_password(login_data.password, user.hashed_password)
+            password_valid = await verify_password_async(login_data.password, user.hashed_password)
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -110,12 +155,19 @@ async def login(
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
+        await login_rate_limiter.reset_username(login_data.username)
+        
+        # Hash cũ (scheme/cost khác cấu hình): hash lại sau khi đã trả response
+        if password_needs_rehash(user.hashed_password):
+            background_tasks.add_task(rehash_password, user.id, login_data.password, user.hashed_password)
+        
         # Tạo access token
         try:
             token_data = generate_access_token(
                 user_id=user.id,
                 username=user.username,
-                email=user.email
+                email=user.email,
+                is_admin=user.is_admin
             )
         except Exception as e:
             raise HTTPException(
@@ -123,7 +175,12 @@ async def login(
                 detail=f"Lỗi tạo token: {str(e)}"
             )
         
-        return token_data
+        # Tạo refresh token (family mới cho mỗi lần login)
+        refresh_token = issue_refresh_token(db, user.id)
+        await db.commit()
+        _set_refresh_cookie(response, refresh_token)
+        
+        return _with_refresh_token(token_data, refresh_token)
     
     except HTTPException:
         raise
@@ -132,3 +189,108 @@ async def login(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Lỗi đăng nhập: {str(e)}"
         )
+
+@router.post("/refresh", response_model=TokenResponse)
+async def refresh(
+    response: Response,
+    refresh_data: Optional[RefreshRequest] = None,
+    refresh_cookie: Optional[str] = Cookie(None, alias=settings.REFRESH_TOKEN_COOKIE_NAME),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Đổi refresh token lấy access token mới (không cần password)
+    
+    - **refresh_token**: Trong body hoặc cookie
+    
+    Refresh token cũ bị thu hồi và thay bằng token mới. Dùng lại token cũ
+    sẽ thu hồi toàn bộ các token của lần đăng nhập đó.
+    """
+    token = (refresh_data.refresh_token if refresh_data else None) or refresh_cookie
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Thiếu refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    user, new_refresh_token = await rotate_refresh_token(db, token)
+    
+    token_data = generate_access_token(
+        user_id=user.id,
+        username=user.username,
+        email=user.email,
+        is_admin=user.is_admin
+    )
+    _set_refresh_cookie(response, new_refresh_token)
+    
+    return _with_refresh_token(token_data, new_refresh_token)
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    refresh_data: Optional[RefreshRequest] = None,
+    refresh_cookie: Optional[str] = Cookie(None, alias=settings.REFRESH_TOKEN_COOKIE_NAME),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Logout - thu hồi refresh token (và các token cùng lần đăng nhập)
+    
+    Nếu gửi kèm access token trong header Authorization thì access token
+    cũng bị thu hồi ngay (resource service từ chối trước khi hết hạn).
+    Access token hết hạn / không hợp lệ được bỏ qua: logout vẫn trả 204.
+    """
+    token = (refresh_data.refresh_token if refresh_data else None) or refresh_cookie
+    if token:
+        await revoke_refresh_token(db, token)
+    
+    if credentials and credentials.scheme.lower() == "bearer":
+        try:
+            claims = decode_access_token(credentials.credentials)
+        except HTTPException:
+            # Token hết hạn thì không cần thu hồi, token sai thì không thu hồi được
+            claims = None
+        if claims is not None:
+            await revoke_access_token(db, claims)
+    
+    response = Response(status_code=status.HTTP_204_NO_CONTENT)
+    response.delete_cookie(settings.REFRESH_TOKEN_COOKIE_NAME, path="/auth")
+    return response
+
+@router.post("/revoke", status_code=status.HTTP_204_NO_CONTENT)
+async def revoke(
+    revoke_data: RevokeRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Thu hồi một access token trước khi hết hạn
+    
+    - **token**: Access token cần thu hồi (phải hợp lệ và chưa hết hạn)
+    """
+    claims = decode_access_token(revoke_data.token)
+    if not claims.get("jti"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Token không có jti, không thể thu hồi"
+        )
+    await revoke_access_token(db, claims)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+@router.get("/revocations", response_model=RevocationFeed)
+async def revocations(
+    since: int = Query(0, ge=0, description="Chỉ lấy các bản ghi có id > since"),
+    limit: int = Query(settings.REVOCATION_FEED_PAGE_SIZE, ge=1, le=settings.REVOCATION_FEED_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Feed các access token đã bị thu hồi và chưa hết hạn
+    
+    Resource service gọi định kỳ với `since` = `last_id` của lần trước.
+    """
+    rows = await list_revocations(db, since, limit)
+    return {
+        "revocations": [
+            {"id": row.id, "jti": row.jti, "exp": int(row.expires_at.replace(tzinfo=timezone.utc).timestamp())}
+            for row in rows
+        ],
+        "last_id": rows[-1].id if rows else since,
+    }
@@ -0,0 +1,21 @@
+"""
+Key discovery routes
+Endpoint: /.well-known/jwks.json (public keys để resource service verify token)
+"""
+
+from fastapi import APIRouter, Response
+
+from app.core.signer import get_jwks
+
+router = APIRouter()
+
+@router.get("/.well-known/jwks.json")
+async def jwks(response: Response):
+    """
+    JSON Web Key Set của Auth Service
+    
+    Gồm key đang dùng để ký và các key cũ (đã rotate) còn hiệu lực.
+    Resource service chọn key theo `kid` trong header của JWT.
+    """
+    response.headers["Cache-Control"] = "public, max-age=300"
+    return get_jwks()
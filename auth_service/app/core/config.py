@@ -4,7 +4,7 @@ Cấu hình database, key paths, TTL, và các settings khác
 """
 
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Literal
 import os
 
 class Settings(BaseSettings):
@@ -12,15 +12,69 @@ class Settings(BaseSettings):
     
     # Database settings
     DATABASE_URL: str = "sqlite:///./data/auth_service.db"
+    ASYNC_DATABASE_URL: str = ""  # Để trống = suy ra từ DATABASE_URL (sqlite -> sqlite+aiosqlite)
     
-    # RSA Key paths
+    # Connection pool
+    DB_POOL_SIZE: int = 10  # Số connection giữ sẵn (đủ cho các reader đồng thời)
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_PRE_PING: bool = False  # True = thêm 1 round trip mỗi lần checkout connection
+    
+    # SQLite tuning (áp dụng cho mỗi connection mới khi DATABASE_URL là sqlite)
+    SQLITE_JOURNAL_MODE: Literal["WAL", "DELETE", "TRUNCATE", "PERSIST", "MEMORY", "OFF"] = "WAL"
+    SQLITE_SYNCHRONOUS: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = "NORMAL"
+    SQLITE_MMAP_SIZE: int = 268435456  # 256 MB
+    SQLITE_CACHE_SIZE: int = -65536  # Giá trị âm = KiB (64 MB)
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    
+    # Key paths (RSA / EC P-256 / Ed25519, theo ALGORITHM)
     PRIVATE_KEY_PATH: str = "rsa_keys/private.pem"
     PUBLIC_KEY_PATH: str = "rsa_keys/public.pem"
+    RETIRED_KEYS_DIR: str = "rsa_keys/retired"  # Key cũ sau khi rotate, vẫn công bố trong JWKS
     
     # JWT settings
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
-    ALGORITHM: str = "RS256"
+    REFRESH_TOKEN_PRUNE_INTERVAL_SECONDS: int = 3600  # Chu kỳ xóa refresh token / jti thu hồi đã hết hạn
+    
+    # Thu hồi access token (resource service đồng bộ qua GET /auth/revocations)
+    REVOCATION_FEED_PAGE_SIZE: int = 1000  # Số jti tối đa mỗi lần đồng bộ
+    REVOCATION_FEED_PATH: str = ""  # Nếu set: ghi thêm mỗi jti bị thu hồi vào file NDJSON này (local stand-in)
+    ALGORITHM: Literal["RS256", "ES256", "EdDSA"] = "RS256"  # Phải khớp loại key trong PRIVATE_KEY_PATH
+    
+    # Password hashing (hash cũ khác cấu hình được hash lại sau khi login thành công)
+    PASSWORD_HASH_SCHEME: Literal["bcrypt", "argon2"] = "bcrypt"  # Scheme cho hash mới
+    BCRYPT_ROUNDS: int = 12  # 0 = tự chọn theo PASSWORD_HASH_TARGET_MS (một lần, lưu vào BCRYPT_ROUNDS_FILE)
+    BCRYPT_ROUNDS_FILE: str = "data/bcrypt_rounds"  # Rounds đã tự chọn, mọi process / worker dùng chung
+    PASSWORD_HASH_TARGET_MS: int = 250  # Thời gian mục tiêu của một lần hash bcrypt khi tự chọn rounds
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536  # KiB (64 MB)
+    ARGON2_PARALLELISM: int = 4
+    PASSWORD_REHASH_ON_LOGIN: bool = True
+    
+    # Password hashing worker pool (bcrypt chạy ngoài event loop)
+    PASSWORD_HASH_EXECUTOR: str = "thread"  # "thread" hoặc "process"
+    PASSWORD_HASH_WORKERS: int = 0  # 0 = dùng số CPU của máy
+    PASSWORD_HASH_MAX_PENDING: int = 64  # Số job tối đa (đang chạy + chờ) trước khi trả 503
+    
+    # Rate limit /auth/login (sliding window, kiểm tra trước khi verify password)
+    LOGIN_RATE_LIMIT_ENABLED: bool = True
+    LOGIN_RATE_LIMIT_WINDOW_SECONDS: int = 60
+    LOGIN_RATE_LIMIT_PER_USERNAME: int = 5  # Số lần thử mỗi username trong một cửa sổ (reset khi login thành công)
+    LOGIN_RATE_LIMIT_PER_IP: int = 30  # Số lần thử mỗi IP trong một cửa sổ
+    RATE_LIMIT_BACKEND: Literal["memory", "sqlite"] = "memory"  # "sqlite" = dùng chung giữa các worker
+    RATE_LIMIT_SQLITE_PATH: str = "data/rate_limit.db"
+    RATE_LIMIT_MAX_KEYS: int = 100000  # Backend memory: số key tối đa (bỏ key ít dùng nhất)
+    RATE_LIMIT_TRUST_FORWARDED_FOR: bool = False  # True khi chạy sau reverse proxy (lấy IP từ X-Forwarded-For)
+    
+    # Cache user cho login (username/email -> id, hash, cờ); xóa khi user thay đổi trong process này
+    USER_CACHE_ENABLED: bool = True
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL_SECONDS: int = 60  # Giới hạn độ trễ khi user bị sửa từ worker / process khác
+    
+    # Metrics (GET /metrics, Prometheus text format)
+    METRICS_ENABLED: bool = True
+    METRICS_MULTIPROC_DIR: str = ""  # Thư mục chung để gộp metrics của các worker (gunicorn.conf.py đặt mặc định)
+    METRICS_FLUSH_SECONDS: int = 5  # Chu kỳ mỗi worker ghi snapshot (độ trễ tối đa của metrics worker khác)
     
     # Security settings
     SECRET_KEY: str = "your-secret-key-here"
@@ -0,0 +1,283 @@
+"""
+Prometheus metrics for Auth Service
+Histogram latency theo route và theo từng giai đoạn (bcrypt, ký JWT, DB, serialize),
+xuất ở GET /metrics theo text format của Prometheus
+"""
+
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+
+from app.core.config import settings
+
+# Bucket (giây): từ 100µs (verify JWT, query index) tới 10s (request chậm)
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+# ==============================================================
+#  Histogram + registry (text format 0.0.4)
+# ==============================================================
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [
+        '%s="%s"' % (name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in zip(names, values)
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Histogram:
+    """Histogram có label, an toàn khi gọi từ nhiều thread"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [count theo từng bucket (không cộng dồn), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, *labelvalues: str):
+        """Đo thời gian của khối lệnh"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labelvalues)
+
+    def snapshot(self) -> List[list]:
+        """[[labels, count theo bucket, sum, count], ...] (dạng JSON được, xem MultiprocessMetrics)"""
+        with self._lock:
+            return [[list(labels), list(series[0]), series[1], series[2]] for labels, series in sorted(self._series.items())]
+
+    def render(self, snapshot: Optional[List[list]] = None) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        if snapshot is None:
+            snapshot = self.snapshot()
+        for labels, counts, total, count in snapshot:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound!r}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Danh sách metric được xuất ở /metrics"""
+
+    def __init__(self):
+        self._metrics: List[Histogram] = []
+
+    def register(self, metric: Histogram) -> Histogram:
+        self._metrics.append(metric)
+        return metric
+
+    def snapshot(self) -> Dict[str, List[list]]:
+        return {metric.name: metric.snapshot() for metric in self._metrics}
+
+    def render(self, snapshots: Optional[Dict[str, List[list]]] = None) -> str:
+        """Render metrics của process này, hoặc snapshots đã gộp từ nhiều process"""
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render(None if snapshots is None else snapshots.get(metric.name, [])))
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+REQUEST_LATENCY = registry.register(Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency theo route template",
+    ("method", "route", "status"),
+))
+
+STAGE_LATENCY = registry.register(Histogram(
+    "stage_duration_seconds",
+    "Latency của từng giai đoạn trong request (password_hash, password_verify, jwt_sign, db_query, ...)",
+    ("stage",),
+))
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def stage_timer(stage: str):
+    """Context manager đo một giai đoạn: `with stage_timer("jwt_sign"): ...`"""
+    return STAGE_LATENCY.time(stage)
+
+# ==============================================================
+#  Gộp metrics của nhiều worker (gunicorn)
+# ==============================================================
+
+class MultiprocessMetrics:
+    """Mỗi worker ghi snapshot vào METRICS_MULTIPROC_DIR/<pid>.json, /metrics cộng mọi file
+
+    Worker trả lời scrape ghi snapshot của nó ngay trước khi gộp, các worker khác ghi định kỳ
+    (trễ tối đa METRICS_FLUSH_SECONDS) và khi tắt. File của worker đã thoát được giữ lại để
+    counter không giảm; master xóa cả thư mục khi khởi động (gunicorn.conf.py).
+    """
+
+    def __init__(self, registry: MetricsRegistry, directory: str, flush_seconds: float):
+        self.registry = registry
+        self.directory = directory
+        self.flush_seconds = flush_seconds
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory)
+
+    def clear(self) -> None:
+        """Xóa snapshot của lần chạy trước (gọi trong master, trước khi fork worker)"""
+        if not self.enabled:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        for name in os.listdir(self.directory):
+            os.remove(os.path.join(self.directory, name))
+
+    def flush(self) -> None:
+        """Ghi snapshot của process này (file tạm + rename: process khác không đọc file ghi dở)"""
+        path = os.path.join(self.directory, f"{os.getpid()}.json")
+        with self._flush_lock:
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(self.registry.snapshot(), f)
+            os.replace(path + ".tmp", path)
+
+    def collect(self) -> Dict[str, List[list]]:
+        """Cộng count theo bucket, sum, count của cùng metric + labels trên mọi file"""
+        merged: Dict[str, Dict[Tuple[str, ...], list]] = {}
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.directory, name), "r", encoding="utf-8") as f:
+                    snapshots = json.load(f)
+            except (OSError, ValueError):
+                continue
+            for metric_name, series in snapshots.items():
+                target = merged.setdefault(metric_name, {})
+                for labels, counts, total, count in series:
+                    current = target.get(tuple(labels))
+                    if current is None:
+                        target[tuple(labels)] = [labels, counts, total, count]
+                    else:
+                        current[1] = [a + b for a, b in zip(current[1], counts)]
+                        current[2] += total
+                        current[3] += count
+        return {name: [series[key] for key in sorted(series)] for name, series in merged.items()}
+
+    def render(self) -> str:
+        """Text format cho GET /metrics: tổng của mọi worker nếu bật, ngược lại của process này"""
+        if not self.enabled:
+            return self.registry.render()
+        self.flush()
+        return self.registry.render(self.collect())
+
+    def start(self) -> None:
+        """Chạy thread ghi snapshot định kỳ (trong worker)"""
+        if not self.enabled or (self._thread is not None and self._thread.is_alive()):
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="metrics-flush", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_seconds):
+            try:
+                self.flush()
+            except OSError as e:
+                print(f"Metrics flush failed: {e}")
+
+    def stop(self) -> None:
+        """Dừng thread và ghi snapshot lần cuối"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout=5)
+        self._thread = None
+        self.flush()
+
+
+# Global multiprocess metrics instance (METRICS_ENABLED=false: không ghi / đọc thư mục snapshot)
+multiprocess_metrics = MultiprocessMetrics(
+    registry,
+    settings.METRICS_MULTIPROC_DIR if settings.METRICS_ENABLED else "",
+    settings.METRICS_FLUSH_SECONDS,
+)
+
+# ==============================================================
+#  Instrumentation
+# ==============================================================
+
+class MetricsMiddleware:
+    """ASGI middleware đo latency mỗi request (tới khi gửi xong response body)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Dùng route template (vd /api/products/{id}) để số label không tăng theo URL
+            route = scope.get("route")
+            REQUEST_LATENCY.observe(
+                time.perf_counter() - start,
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                str(status_code),
+            )
+
+
+def instrument_engine(engine) -> None:
+    """Đo thời gian mỗi câu lệnh SQL (stage db_query) qua event của SQLAlchemy"""
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info["query_start_time"] = time.perf_counter()
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info.pop("query_start_time", None)
+        if start is not None:
+            STAGE_LATENCY.observe(time.perf_counter() - start, "db_query")
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
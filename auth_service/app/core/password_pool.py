@@ -0,0 +1,82 @@
+"""
+Password hashing worker pool
+Chạy bcrypt hash/verify trong thread hoặc process pool có giới hạn hàng đợi,
+để event loop của uvicorn không bị chặn khi login/register
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from app.core.config import settings
+
+
+class PasswordPoolBusy(RuntimeError):
+    """Raised khi pool đã đầy (back-pressure)"""
+
+
+class PasswordHashPool:
+    """Bounded executor cho các tác vụ hash password tốn CPU"""
+
+    def __init__(self, kind: str = "thread", workers: int = 0, max_pending: int = 64):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"PASSWORD_HASH_EXECUTOR không hợp lệ: {kind}")
+        self.kind = kind
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.max_pending = max(max_pending, self.workers)
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        """Số job đang chạy + đang chờ"""
+        return self._pending
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix="password-hash",
+                )
+        return self._executor
+
+    def _release(self, _future: Any = None) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Chạy fn(*args) trong pool, raise PasswordPoolBusy nếu hàng đợi đã đầy"""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise PasswordPoolBusy(
+                    f"Password hash pool đang quá tải ({self._pending}/{self.max_pending})"
+                )
+            self._pending += 1
+
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self) -> None:
+        """Dừng executor (gọi khi app shutdown)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+# Global pool instance
+password_pool = PasswordHashPool(
+    kind=settings.PASSWORD_HASH_EXECUTOR,
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
@@ -0,0 +1,203 @@
+"""
+Login rate limiter
+Sliding-window counter (O(1) mỗi key: chỉ giữ số lần của cửa sổ hiện tại và cửa sổ trước)
+theo username và theo IP, kiểm tra trước khi verify bcrypt nên request bị chặn gần như không tốn CPU.
+Backend: "memory" (trong process) hoặc "sqlite" (file dùng chung giữa các worker, thay cho Redis khi chạy local)
+"""
+
+import asyncio
+import math
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+
+from app.core.config import settings
+
+# (bắt đầu cửa sổ hiện tại, số lần trong cửa sổ hiện tại, số lần trong cửa sổ trước)
+WindowState = Tuple[float, int, int]
+
+def sliding_window_hit(state: Optional[WindowState], now: float, limit: int, window: float) -> Tuple[WindowState, bool, int]:
+    """Tính một lần thử: trả về (state mới, được phép?, retry_after giây)
+
+    Số lần ước lượng = previous * (phần cửa sổ trước còn nằm trong khoảng window) + current.
+    """
+    window_start = now - now % window
+    if state is None or state[0] < window_start - window:
+        current, previous = 0, 0
+    elif state[0] < window_start:
+        current, previous = 0, state[1]
+    else:
+        current, previous = state[1], state[2]
+
+    elapsed = now - window_start
+    estimated = previous * (1 - elapsed / window) + current
+    if estimated < limit:
+        return (window_start, current + 1, previous), True, 0
+
+    # Thời gian chờ tới khi số lần ước lượng xuống dưới limit (lần thử bị chặn không được tính)
+    if current < limit:
+        wait = window * (1 - (limit - current) / previous) - elapsed
+    else:
+        wait = (window - elapsed) + window * (1 - limit / current)
+    return (window_start, current, previous), False, max(1, math.ceil(wait))
+
+# ==============================================================
+#  Backends
+# ==============================================================
+
+class RateLimitBackend(ABC):
+    """Interface cho backend lưu trạng thái rate limit (in-memory, SQLite, Redis, ...)"""
+
+    # True nếu hit/reset có I/O (chờ lock file, network): limiter gọi trong thread, không chặn event loop
+    blocking = False
+
+    @abstractmethod
+    def hit(self, key: str, limit: int, window: float) -> Tuple[bool, int]:
+        ...
+
+    @abstractmethod
+    def reset(self, key: str) -> None:
+        ...
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """Trạng thái trong process, giới hạn số key (bỏ key ít dùng nhất)"""
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._states: "OrderedDict[str, WindowState]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, limit: int, window: float) -> Tuple[bool, int]:
+        with self._lock:
+            state, allowed, retry_after = sliding_window_hit(self._states.get(key), time.time(), limit, window)
+            self._states[key] = state
+            self._states.move_to_end(key)
+            while len(self._states) > self.max_keys:
+                self._states.popitem(last=False)
+            return allowed, retry_after
+
+    def reset(self, key: str) -> None:
+        with self._lock:
+            self._states.pop(key, None)
+
+
+class SQLiteRateLimitBackend(RateLimitBackend):
+    """Trạng thái trong file SQLite, dùng chung giữa các worker trên cùng máy"""
+
+    blocking = True  # BEGIN IMMEDIATE có thể chờ lock của worker khác tới 5 giây
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limits ("
+            "key TEXT PRIMARY KEY, window_start REAL NOT NULL, current INTEGER NOT NULL, previous INTEGER NOT NULL)"
+        )
+        self._lock = threading.Lock()
+        self._hits = 0
+
+    def hit(self, key: str, limit: int, window: float) -> Tuple[bool, int]:
+        now = time.time()
+        with self._lock:
+            # BEGIN IMMEDIATE: đọc-sửa-ghi nguyên tử giữa các process
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT window_start, current, previous FROM rate_limits WHERE key = ?", (key,)
+                ).fetchone()
+                state, allowed, retry_after = sliding_window_hit(row, now, limit, window)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO rate_limits (key, window_start, current, previous) VALUES (?, ?, ?, ?)",
+                    (key, *state),
+                )
+                self._hits += 1
+                if self._hits % 1000 == 0:
+                    # Dọn các key không còn ảnh hưởng tới cửa sổ hiện tại
+                    self._conn.execute("DELETE FROM rate_limits WHERE window_start < ?", (now - 2 * window,))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            return allowed, retry_after
+
+    def reset(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM rate_limits WHERE key = ?", (key,))
+
+
+def create_rate_limit_backend(name: str) -> RateLimitBackend:
+    """Tạo backend theo tên cấu hình"""
+    if name == "memory":
+        return InMemoryRateLimitBackend(max_keys=settings.RATE_LIMIT_MAX_KEYS)
+    if name == "sqlite":
+        return SQLiteRateLimitBackend(settings.RATE_LIMIT_SQLITE_PATH)
+    raise ValueError(f"RATE_LIMIT_BACKEND không hợp lệ: {name}")
+
+# ==============================================================
+#  Login limiter
+# ==============================================================
+
+class LoginRateLimiter:
+    """Giới hạn số lần thử login theo username và theo IP"""
+
+    def __init__(self, backend: Optional[RateLimitBackend], enabled: bool = True):
+        self._backend = backend
+        self.enabled = enabled
+
+    @property
+    def backend(self) -> RateLimitBackend:
+        # Tạo lúc dùng lần đầu (backend sqlite mở file)
+        if self._backend is None:
+            self._backend = create_rate_limit_backend(settings.RATE_LIMIT_BACKEND)
+        return self._backend
+
+    @staticmethod
+    def client_ip(request: Request) -> str:
+        if settings.RATE_LIMIT_TRUST_FORWARDED_FOR:
+            forwarded = request.headers.get("x-forwarded-for")
+            if forwarded:
+                return forwarded.split(",")[0].strip()
+        return request.client.host if request.client else "unknown"
+
+    async def _call(self, fn, *args):
+        """Gọi backend: trong thread nếu backend blocking, ngược lại gọi trực tiếp"""
+        if self.backend.blocking:
+            return await asyncio.to_thread(fn, *args)
+        return fn(*args)
+
+    async def check(self, request: Request, username: str) -> None:
+        """Raise 429 nếu IP hoặc username đã vượt giới hạn (gọi trước khi verify password)"""
+        if not self.enabled:
+            return
+        window = settings.LOGIN_RATE_LIMIT_WINDOW_SECONDS
+        checks = (
+            (f"login:ip:{self.client_ip(request)}", settings.LOGIN_RATE_LIMIT_PER_IP),
+            (f"login:user:{username.strip().lower()}", settings.LOGIN_RATE_LIMIT_PER_USERNAME),
+        )
+        for key, limit in checks:
+            allowed, retry_after = await self._call(self.backend.hit, key, limit, window)
+            if not allowed:
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Quá nhiều lần đăng nhập, vui lòng thử lại sau",
+                    headers={"Retry-After": str(retry_after)},
+                )
+
+    async def reset_username(self, username: str) -> None:
+        """Login thành công: xóa bộ đếm của username (không xóa bộ đếm theo IP)"""
+        if self.enabled:
+            await self._call(self.backend.reset, f"login:user:{username.strip().lower()}")
+
+
+# Global login limiter instance
+login_rate_limiter = LoginRateLimiter(backend=None, enabled=settings.LOGIN_RATE_LIMIT_ENABLED)
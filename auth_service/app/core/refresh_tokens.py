@@ -0,0 +1,140 @@
+"""
+Refresh token store
+Refresh token là chuỗi ngẫu nhiên (opaque), DB chỉ lưu SHA-256 của token.
+Mỗi lần refresh token cũ bị thu hồi và thay bằng token mới (rotation);
+dùng lại token đã thu hồi = token bị lộ -> thu hồi cả family
+"""
+
+import asyncio
+import hashlib
+import secrets
+import uuid
+from datetime import datetime, timedelta
+from typing import Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+
+# ==============================================================
+#  Tạo / băm token
+# ==============================================================
+
+def hash_refresh_token(token: str) -> str:
+    """SHA-256 của token (token đủ ngẫu nhiên nên không cần bcrypt)"""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+def _invalid_refresh_token(detail: str = "Refresh token không hợp lệ hoặc đã hết hạn") -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+def issue_refresh_token(db: AsyncSession, user_id: int, family_id: str = None) -> str:
+    """Tạo refresh token mới và thêm vào session (caller commit)"""
+    token = secrets.token_urlsafe(32)
+    db.add(RefreshToken(
+        token_hash=hash_refresh_token(token),
+        family_id=family_id or uuid.uuid4().hex,
+        user_id=user_id,
+        expires_at=datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+    ))
+    return token
+
+# ==============================================================
+#  Rotation / revocation
+# ==============================================================
+
+async def rotate_refresh_token(db: AsyncSession, token: str) -> Tuple[User, str]:
+    """Đổi refresh token cũ lấy token mới, trả về (user, token mới)
+
+    Chỉ tốn một lookup theo index token_hash (join users theo primary key).
+    """
+    result = await db.execute(
+        select(RefreshToken, User)
+        .join(User, User.id == RefreshToken.user_id)
+        .where(RefreshToken.token_hash == hash_refresh_token(token))
+    )
+    row = result.first()
+    if row is None:
+        raise _invalid_refresh_token()
+    stored, user = row
+
+    now = datetime.utcnow()
+    if stored.expires_at <= now:
+        raise _invalid_refresh_token()
+
+    # UPDATE có điều kiện: hai request dùng cùng token thì chỉ một request thắng
+    revoked = await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.id == stored.id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    if revoked.rowcount != 1:
+        # Token đã bị xoay vòng trước đó -> có thể đã bị lộ, thu hồi cả family
+        await revoke_refresh_family(db, stored.family_id)
+        raise _invalid_refresh_token("Refresh token đã được sử dụng, vui lòng đăng nhập lại")
+
+    if not user.is_active:
+        await db.commit()
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Tài khoản đã bị vô hiệu hóa"
+        )
+
+    new_token = issue_refresh_token(db, user.id, family_id=stored.family_id)
+    await db.commit()
+    return user, new_token
+
+async def revoke_refresh_family(db: AsyncSession, family_id: str) -> None:
+    """Thu hồi mọi refresh token còn hiệu lực trong family và commit"""
+    await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+
+async def revoke_refresh_token(db: AsyncSession, token: str) -> None:
+    """Logout: thu hồi family của token (không báo lỗi nếu token không tồn tại)"""
+    result = await db.execute(
+        select(RefreshToken.family_id).where(RefreshToken.token_hash == hash_refresh_token(token))
+    )
+    family_id = result.scalar()
+    if family_id is not None:
+        await revoke_refresh_family(db, family_id)
+
+# ==============================================================
+#  TTL pruning
+# ==============================================================
+
+async def prune_expired_refresh_tokens(db: AsyncSession) -> int:
+    """Xóa các token đã hết hạn, trả về số dòng đã xóa"""
+    result = await db.execute(
+        delete(RefreshToken)
+        .where(RefreshToken.expires_at <= datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount
+
+async def prune_expired_tokens_periodically() -> None:
+    """Background task: định kỳ xóa refresh token và jti thu hồi đã hết hạn (bảng không phình theo thời gian)"""
+    from app.core.revocation import prune_expired_revocations
+    from app.db.database import AsyncSessionLocal
+
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                await prune_expired_refresh_tokens(db)
+                await prune_expired_revocations(db)
+        except Exception as e:
+            print(f"Error pruning expired tokens: {e}")
+        await asyncio.sleep(settings.REFRESH_TOKEN_PRUNE_INTERVAL_SECONDS)
@@ -0,0 +1,53 @@
+"""
+Access token revocation
+Lưu jti của access token bị thu hồi và cung cấp feed tăng dần theo id
+để resource service đồng bộ vào deny-list trong memory
+"""
+
+import json
+from datetime import datetime
+from typing import Any, Dict, List
+
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.revoked_token import RevokedToken
+
+async def revoke_access_token(db: AsyncSession, claims: Dict[str, Any]) -> bool:
+    """Thu hồi access token đã verify; trả về False nếu đã thu hồi trước đó"""
+    jti, exp = claims.get("jti"), claims.get("exp")
+    if not jti or not exp:
+        return False
+    db.add(RevokedToken(jti=jti, expires_at=datetime.utcfromtimestamp(exp)))
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        return False
+    if settings.REVOCATION_FEED_PATH:
+        # Feed dạng file (local stand-in khi resource service không gọi được HTTP feed)
+        with open(settings.REVOCATION_FEED_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"jti": jti, "exp": exp}) + "\n")
+    return True
+
+async def list_revocations(db: AsyncSession, since: int, limit: int) -> List[RevokedToken]:
+    """Các token bị thu hồi có id > since và chưa hết hạn, theo thứ tự id"""
+    result = await db.execute(
+        select(RevokedToken)
+        .where(RevokedToken.id > since, RevokedToken.expires_at > datetime.utcnow())
+        .order_by(RevokedToken.id)
+        .limit(limit)
+    )
+    return result.scalars().all()
+
+async def prune_expired_revocations(db: AsyncSession) -> int:
+    """Xóa các jti của token đã hết hạn (token hết hạn thì không cần deny-list nữa)"""
+    result = await db.execute(
+        delete(RevokedToken)
+        .where(RevokedToken.expires_at <= datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount
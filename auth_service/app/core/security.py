@@ -4,12 +4,20 @@ Hash password, verify password, tạo JWT với RSA private key
 """
 
 from functools import lru_cache
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+import math
+import time
 from datetime import datetime, timedelta
-from jose import jwt
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
+from passlib.exc import MissingBackendError
+import jwt as pyjwt
 import os
+import uuid
 from app.core.config import settings
+from app.core.metrics import stage_timer
+from app.core.password_pool import password_pool, PasswordPoolBusy
+from app.core.signer import get_signer, get_verification_keys
 
 # Password hashing context
 # Đảm bảo bcrypt được load bằng cách import trước
@@ -18,20 +26,98 @@ try:
 except ImportError:
     pass
 
-# Khởi tạo CryptContext với bcrypt
-pwd_context = CryptContext(
-    schemes=["bcrypt"],
-    bcrypt__rounds=12,
-    deprecated="auto"
-)
+def calibrate_bcrypt_rounds(target_ms: float, min_rounds: int = 10, max_rounds: int = 16) -> int:
+    """Chọn số rounds bcrypt để một lần hash tốn khoảng target_ms trên máy hiện tại"""
+    start = time.perf_counter()
+    CryptContext(schemes=["bcrypt"], bcrypt__rounds=min_rounds).hash("calibration")
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    # Thêm 1 round thì thời gian hash tăng gấp đôi
+    rounds = min_rounds + round(math.log2(target_ms / elapsed_ms))
+    return max(min_rounds, min(max_rounds, rounds))
 
-# Force load bcrypt backend ngay khi import module
-try:
-    # Test hash để đảm bảo bcrypt backend được load
-    _ = pwd_context.hash("init_test")
-except Exception:
-    # Nếu lỗi, thử lại với default settings
-    pass
+def read_bcrypt_rounds() -> Optional[int]:
+    """BCRYPT_ROUNDS, hoặc giá trị đã calibrate trong BCRYPT_ROUNDS_FILE (None nếu chưa có, không hash)"""
+    if settings.BCRYPT_ROUNDS > 0:
+        return settings.BCRYPT_ROUNDS
+    try:
+        with open(settings.BCRYPT_ROUNDS_FILE, "r", encoding="utf-8") as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+def resolve_bcrypt_rounds() -> int:
+    """Số rounds bcrypt: read_bcrypt_rounds(), nếu chưa có thì calibrate rồi lưu vào BCRYPT_ROUNDS_FILE
+    
+    Chỉ process đầu tiên (thường là `python -m app.db.seed` trước khi chạy server) phải
+    calibrate; các worker / process sau đọc lại file nên luôn dùng cùng một giá trị.
+    """
+    rounds = read_bcrypt_rounds()
+    if rounds is not None:
+        return rounds
+    
+    path = settings.BCRYPT_ROUNDS_FILE
+    rounds = calibrate_bcrypt_rounds(settings.PASSWORD_HASH_TARGET_MS)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(str(rounds))
+    try:
+        # link() không ghi đè: nếu process khác đã lưu trước thì dùng giá trị của process đó
+        os.link(tmp_path, path)
+    except FileExistsError:
+        with open(path, "r", encoding="utf-8") as f:
+            rounds = int(f.read().strip())
+    finally:
+        os.remove(tmp_path)
+    return rounds
+
+def build_password_context() -> CryptContext:
+    """CryptContext theo cấu hình: scheme mặc định + cost hiện tại
+    
+    Hash dùng scheme khác (deprecated="auto") hoặc cost khác (min = max = cost hiện tại)
+    bị needs_update() đánh dấu và được hash lại dần khi user login.
+    Rounds tự chọn (BCRYPT_ROUNDS=0) chấp nhận lệch 1 round, để các máy calibrate ra
+    kết quả khác nhau không hash lại password của nhau mãi.
+    """
+    rounds = resolve_bcrypt_rounds()
+    tolerance = 1 if settings.BCRYPT_ROUNDS <= 0 else 0
+    
+    default_scheme = settings.PASSWORD_HASH_SCHEME
+    return CryptContext(
+        schemes=[default_scheme] + [s for s in ("bcrypt", "argon2") if s != default_scheme],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=max(4, rounds - tolerance),
+        bcrypt__max_rounds=min(31, rounds + tolerance),
+        argon2__rounds=settings.ARGON2_TIME_COST,
+        argon2__min_rounds=settings.ARGON2_TIME_COST,
+        argon2__max_rounds=settings.ARGON2_TIME_COST,
+        argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+        argon2__parallelism=settings.ARGON2_PARALLELISM,
+    )
+
+@lru_cache(maxsize=None)
+def get_password_context() -> CryptContext:
+    """CryptContext dùng chung (bcrypt mặc định, argon2 cần package argon2-cffi)
+    
+    Tạo ở lần dùng đầu (warm-up, seed), không lúc import module: với BCRYPT_ROUNDS=0 và
+    chưa có BCRYPT_ROUNDS_FILE, lần tạo đầu tiên phải calibrate (hash thử).
+    """
+    return build_password_context()
+
+def load_hash_backends() -> None:
+    """Load backend của các scheme (bcrypt, argon2) mà không cần hash password
+    
+    Gọi khi warm-up ở background thay vì hash thử lúc import module.
+    Scheme cũ thiếu backend chỉ lỗi khi gặp hash của scheme đó, scheme mặc định thì phải có.
+    """
+    context = get_password_context()
+    for scheme in context.schemes():
+        try:
+            context.handler(scheme).get_backend()
+        except MissingBackendError:
+            if scheme == settings.PASSWORD_HASH_SCHEME:
+                raise
 
 # ==============================================================
 #  Password Hashing
@@ -51,7 +137,7 @@ def get_password_hash(password: str) -> str:
     if len(password_bytes) > 72:
         password = password_bytes[:72].decode('utf-8', errors='ignore')
     
-    return pwd_context.hash(password)
+    return get_password_context().hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify password against hash"""
@@ -65,30 +151,90 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         if len(password_bytes) > 72:
             plain_password = password_bytes[:72].decode('utf-8', errors='ignore')
         
-        return pwd_context.verify(plain_password, hashed_password)
+        return get_password_context().verify(plain_password, hashed_password)
     except Exception as e:
         # Log error để debug
         print(f"Error verifying password: {e}")
         return False
 
+async def _run_in_password_pool(fn, *args):
+    """Chạy hàm hash trong password pool, trả 503 nếu pool quá tải"""
+    try:
+        return await password_pool.run(fn, *args)
+    except PasswordPoolBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Hệ thống đang bận, vui lòng thử lại sau",
+            headers={"Retry-After": "1"},
+        )
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash password trong worker pool (không chặn event loop)"""
+    with stage_timer("password_hash"):
+        return await _run_in_password_pool(get_password_hash, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify password trong worker pool (không chặn event loop)"""
+    with stage_timer("password_verify"):
+        return await _run_in_password_pool(verify_password, plain_password, hashed_password)
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Hash dùng scheme/cost cũ so với cấu hình hiện tại (chỉ parse hash, không tốn CPU)"""
+    if not settings.PASSWORD_REHASH_ON_LOGIN:
+        return False
+    try:
+        return get_password_context().needs_update(hashed_password)
+    except ValueError:
+        return False
+
+async def rehash_password(user_id: int, plain_password: str, old_hash: str) -> None:
+    """Hash lại password theo cấu hình hiện tại (chạy sau khi đã trả response login)"""
+    from sqlalchemy import update
+    from app.core.user_cache import user_cache
+    from app.db.database import AsyncSessionLocal
+    from app.models.user import User
+    
+    try:
+        new_hash = await password_pool.run(get_password_hash, plain_password)
+    except PasswordPoolBusy:
+        # Pool đang bận phục vụ login: bỏ qua, lần login sau sẽ thử lại
+        return
+    
+    async with AsyncSessionLocal() as db:
+        # Chỉ ghi đè nếu hash chưa bị đổi (vd user vừa đổi password)
+        await db.execute(
+            update(User)
+            .where(User.id == user_id, User.hashed_password == old_hash)
+            .values(hashed_password=new_hash)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+    
+    # Cache vẫn giữ hash cũ (UPDATE dạng Core không kích hoạt ORM event)
+    user_cache.invalidate_user(user_id)
+
 # ==============================================================
 #  JWT Token Creation (RSA Private Key)
 # ==============================================================
 
-@lru_cache()
-def load_private_key() -> str:
-    """Đọc private key từ file PEM và cache lại."""
-    # Thử nhiều đường dẫn để tìm private key
-    possible_paths = [
+def key_path_candidates(relative_path: str) -> List[str]:
+    """Các vị trí có thể chứa file key (Docker / local development)"""
+    return [
         # Đường dẫn tương đối từ working directory (Docker: /app, Local: auth_service/)
-        settings.PRIVATE_KEY_PATH,
+        relative_path,
         # Đường dẫn tuyệt đối từ thư mục auth_service (local development)
-        os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))), settings.PRIVATE_KEY_PATH),
+        os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))), relative_path),
         # Đường dẫn từ thư mục hiện tại
-        os.path.join(os.getcwd(), settings.PRIVATE_KEY_PATH),
+        os.path.join(os.getcwd(), relative_path),
         # Đường dẫn trong Docker (/app)
-        os.path.join("/app", settings.PRIVATE_KEY_PATH),
+        os.path.join("/app", relative_path),
     ]
+
+@lru_cache()
+def load_private_key() -> str:
+    """Đọc private key từ file PEM và cache lại."""
+    # Thử nhiều đường dẫn để tìm private key
+    possible_paths = key_path_candidates(settings.PRIVATE_KEY_PATH)
     
     private_key_path = None
     for path in possible_paths:
@@ -131,19 +277,38 @@ def create_access_token(data: Dict[str, Any], expires_delta: timedelta = None) -
         "exp": int(expire.timestamp()),  # Convert to Unix timestamp
         "iat": int(now.timestamp()),      # Convert to Unix timestamp
         "iss": "auth_service",            # Issuer
+        "jti": uuid.uuid4().hex,          # Token ID (dùng để thu hồi token)
     })
     
     try:
-        private_key = load_private_key()
+        # Signer giữ private key đã parse sẵn (không parse lại PEM mỗi lần ký)
+        signer = get_signer()
     except Exception as e:
         raise ValueError(f"Không thể load private key: {str(e)}")
     
     try:
-        encoded_jwt = jwt.encode(
-            to_encode,
-            private_key,
-            algorithm=settings.ALGORITHM
-        )
+        with stage_timer("jwt_sign"):
+            encoded_jwt = signer.sign(to_encode)
         return encoded_jwt
     except Exception as e:
-        raise ValueError(f"Không thể tạo JWT token: {str(e)}")
\ No newline at end of file
+        raise ValueError(f"Không thể tạo JWT token: {str(e)}")
+
+def decode_access_token(token: str) -> Dict[str, Any]:
+    """Verify access token do Auth Service phát hành (chọn public key theo kid)"""
+    try:
+        kid = pyjwt.get_unverified_header(token).get("kid")
+        if kid is None:
+            # Token phát hành trước khi có kid -> key đang dùng để ký
+            signer = get_signer()
+            key, algorithm = signer.private_key.public_key(), signer.algorithm
+        elif kid in get_verification_keys():
+            key, algorithm = get_verification_keys()[kid]
+        else:
+            raise pyjwt.InvalidTokenError(f"Không tìm thấy public key cho kid '{kid}'")
+        return pyjwt.decode(token, key, algorithms=[algorithm])
+    except pyjwt.InvalidTokenError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=f"Không thể xác thực token: {str(e)}",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
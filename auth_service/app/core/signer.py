@@ -0,0 +1,155 @@
+"""
+JWT signer for Auth Service
+Parse private key PEM một lần, giữ key object của `cryptography` để ký token trực tiếp.
+Hỗ trợ RS256 (RSA), ES256 (ECDSA P-256) và EdDSA (Ed25519), chọn bằng ALGORITHM.
+Mỗi key có `kid` (JWK thumbprint, RFC 7638) và được công bố qua JWKS
+"""
+
+import base64
+import glob
+import hashlib
+import json
+import os
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
+
+import jwt as pyjwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from jwt.exceptions import InvalidKeyError
+
+from app.core.config import settings
+
+# Các trường bắt buộc của JWK dùng để tính thumbprint (RFC 7638)
+_THUMBPRINT_MEMBERS = {
+    "RSA": ("e", "kty", "n"),
+    "EC": ("crv", "kty", "x", "y"),
+    "OKP": ("crv", "kty", "x"),
+}
+
+
+def jwk_thumbprint(jwk: Dict[str, Any]) -> str:
+    """Tính JWK thumbprint (SHA-256, base64url) để dùng làm kid"""
+    members = {name: jwk[name] for name in _THUMBPRINT_MEMBERS[jwk["kty"]]}
+    canonical = json.dumps(members, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    return base64.urlsafe_b64encode(hashlib.sha256(canonical).digest()).decode("ascii").rstrip("=")
+
+
+def algorithm_for_key(key) -> str:
+    """Thuật toán JWT mặc định theo loại key (dùng cho key cũ trong RETIRED_KEYS_DIR)"""
+    if isinstance(key, (rsa.RSAPrivateKey, rsa.RSAPublicKey)):
+        return "RS256"
+    if isinstance(key, (ec.EllipticCurvePrivateKey, ec.EllipticCurvePublicKey)):
+        return "ES256"
+    if isinstance(key, (ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey)):
+        return "EdDSA"
+    raise ValueError(f"Loại key không hỗ trợ: {type(key).__name__}")
+
+
+def public_jwk(public_key, algorithm: str) -> Dict[str, Any]:
+    """Chuyển public key thành JWK (kèm kid, alg, use)"""
+    jwk = pyjwt.get_algorithm_by_name(algorithm).to_jwk(public_key, as_dict=True)
+    jwk.pop("key_ops", None)  # Dùng "use" thay cho "key_ops"
+    jwk.update({"kid": jwk_thumbprint(jwk), "alg": algorithm, "use": "sig"})
+    return jwk
+
+
+def _load_pem_key(pem: bytes):
+    """Parse PEM thành key object (private hoặc public)"""
+    if b"PRIVATE KEY" in pem:
+        return serialization.load_pem_private_key(pem, password=None)
+    return serialization.load_pem_public_key(pem)
+
+
+class TokenSigner:
+    """Ký JWT bằng private key đã được parse sẵn"""
+
+    def __init__(self, private_key_pem: str, algorithm: str):
+        self.algorithm = algorithm
+        # Parse PKCS8 PEM -> key object (chỉ làm một lần, không lặp lại mỗi lần login)
+        self._private_key = serialization.load_pem_private_key(
+            private_key_pem.encode("utf-8"),
+            password=None,
+        )
+        # Báo lỗi ngay khi khởi động nếu ALGORITHM không khớp loại key (vd ES256 + RSA key)
+        try:
+            pyjwt.get_algorithm_by_name(algorithm).prepare_key(self._private_key)
+        except (InvalidKeyError, TypeError, ValueError) as e:
+            raise ValueError(
+                f"ALGORITHM={algorithm} không dùng được với {type(self._private_key).__name__}: {e}"
+            )
+        self.jwk = public_jwk(self._private_key.public_key(), algorithm)
+        self.kid = self.jwk["kid"]
+
+    @property
+    def private_key(self):
+        """Key object của cryptography"""
+        return self._private_key
+
+    def sign(self, claims: Dict[str, Any]) -> str:
+        """Ký claims và trả về JWT compact string (header có kid)"""
+        return pyjwt.encode(
+            claims,
+            self._private_key,
+            algorithm=self.algorithm,
+            headers={"kid": self.kid},
+        )
+
+
+@lru_cache()
+def get_signer() -> TokenSigner:
+    """Tạo signer từ private key và cache lại."""
+    from app.core.security import load_private_key
+    return TokenSigner(load_private_key(), settings.ALGORITHM)
+
+
+def load_retired_public_keys() -> List[Any]:
+    """Đọc các key cũ (đã rotate) trong RETIRED_KEYS_DIR
+
+    Key cũ không còn dùng để ký nhưng vẫn được công bố trong JWKS
+    để token đã phát hành trước khi rotate còn verify được tới khi hết hạn.
+    """
+    from app.core.security import key_path_candidates
+
+    for directory in key_path_candidates(settings.RETIRED_KEYS_DIR):
+        if os.path.isdir(directory):
+            keys = []
+            for path in sorted(glob.glob(os.path.join(directory, "*.pem"))):
+                with open(path, "rb") as f:
+                    key = _load_pem_key(f.read())
+                keys.append(key.public_key() if hasattr(key, "private_bytes") else key)
+            return keys
+    return []
+
+
+@lru_cache()
+def get_verification_keys() -> Dict[str, Tuple[Any, str]]:
+    """Map kid -> (public key, thuật toán) của key đang ký và các key cũ"""
+    signer = get_signer()
+    keys = {signer.kid: (signer.private_key.public_key(), signer.algorithm)}
+    for public_key in load_retired_public_keys():
+        jwk = public_jwk(public_key, algorithm_for_key(public_key))
+        keys.setdefault(jwk["kid"], (public_key, jwk["alg"]))
+    return keys
+
+
+@lru_cache()
+def get_jwks() -> Dict[str, List[Dict[str, Any]]]:
+    """JWKS gồm key đang ký và các key cũ còn hiệu lực"""
+    signer = get_signer()
+    keys = [signer.jwk]
+    for public_key in load_retired_public_keys():
+        jwk = public_jwk(public_key, algorithm_for_key(public_key))
+        if jwk["kid"] != signer.kid:
+            keys.append(jwk)
+    return {"keys": keys}
+
+
+def reload_signer() -> TokenSigner:
+    """Đọc lại private key từ file (dùng khi thay key) và parse lại."""
+    from app.core.security import load_private_key
+    load_private_key.cache_clear()
+    get_signer.cache_clear()
+    get_verification_keys.cache_clear()
+    get_jwks.cache_clear()
+    return get_signer()
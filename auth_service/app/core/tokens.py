@@ -8,14 +8,15 @@ from typing import Dict, Any
 from app.core.config import settings
 from app.core.security import create_access_token
 
-def generate_access_token(user_id: int, username: str, email: str = None) -> Dict[str, Any]:
+def generate_access_token(user_id: int, username: str, email: str = None, is_admin: bool = False) -> Dict[str, Any]:
     """
-    Generate access token only (không cần refresh token)
+    Generate access token (refresh token do app.core.refresh_tokens quản lý)
     
     Args:
         user_id: User ID
         username: Username
         email: Email (optional)
+        is_admin: User có quyền admin không (resource service dùng để phân quyền)
     
     Returns:
         Dictionary chứa access_token, token_type, expires_in
@@ -24,6 +25,7 @@ def generate_access_token(user_id: int, username: str, email: str = None) -> Dic
     token_data = {
         "sub": str(user_id),  # Subject (user id)
         "username": username,
+        "is_admin": is_admin,
     }
     
     if email:
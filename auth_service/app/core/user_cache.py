@@ -0,0 +1,131 @@
+"""
+Login user lookup + cache
+Tra user theo đúng unique index (email nếu có '@', ngược lại username), chỉ select các cột
+login cần, và giữ kết quả trong LRU cache có TTL để login chỉ còn tốn thời gian verify password.
+Cache được xóa khi user thay đổi (ORM event trên User, hoặc gọi invalidate_user sau UPDATE dạng Core).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional, Set
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.user import User
+
+
+class AuthUser(NamedTuple):
+    """Các cột của User cần cho login (không phải ORM object, không qua identity map)"""
+    id: int
+    username: str
+    email: str
+    hashed_password: str
+    is_active: bool
+    is_admin: bool
+
+
+AUTH_USER_COLUMNS = (User.id, User.username, User.email, User.hashed_password, User.is_active, User.is_admin)
+
+
+class UserCache:
+    """LRU cache identifier (username / email) -> AuthUser, hết hạn sau ttl giây"""
+
+    def __init__(self, max_size: int = 10000, ttl: float = 60, enabled: bool = True):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.enabled = enabled and max_size > 0
+        self._entries: "OrderedDict[str, tuple[AuthUser, float]]" = OrderedDict()
+        self._keys_by_user: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, identifier: str) -> Optional[AuthUser]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(identifier)
+            if entry is None:
+                return None
+            user, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._remove(identifier)
+                return None
+            self._entries.move_to_end(identifier)
+            return user
+
+    def set(self, identifier: str, user: AuthUser) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._remove(identifier)
+            self._entries[identifier] = (user, time.monotonic() + self.ttl)
+            self._keys_by_user.setdefault(user.id, set()).add(identifier)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Xóa mọi entry (theo username và email) của user"""
+        with self._lock:
+            for identifier in list(self._keys_by_user.get(user_id, ())):
+                self._remove(identifier)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def _remove(self, identifier: str) -> None:
+        entry = self._entries.pop(identifier, None)
+        if entry is not None:
+            keys = self._keys_by_user.get(entry[0].id)
+            if keys is not None:
+                keys.discard(identifier)
+                if not keys:
+                    del self._keys_by_user[entry[0].id]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Global user cache instance
+user_cache = UserCache(
+    max_size=settings.USER_CACHE_SIZE,
+    ttl=settings.USER_CACHE_TTL_SECONDS,
+    enabled=settings.USER_CACHE_ENABLED,
+)
+
+
+async def _fetch_by(db: AsyncSession, column, identifier: str) -> Optional[AuthUser]:
+    row = (await db.execute(select(*AUTH_USER_COLUMNS).where(column == identifier))).first()
+    return AuthUser(*row) if row is not None else None
+
+
+async def get_login_user(db: AsyncSession, identifier: str) -> Optional[AuthUser]:
+    """Tìm user theo username hoặc email (một lần seek trên ix_users_email / ix_users_username)
+
+    Email luôn có '@'; username cũng có thể chứa '@' nên nếu không thấy email thì thử username.
+    Không cache kết quả "không tồn tại" (user mới đăng ký login được ngay).
+    """
+    user = user_cache.get(identifier)
+    if user is not None:
+        return user
+
+    if "@" in identifier:
+        user = await _fetch_by(db, User.email, identifier) or await _fetch_by(db, User.username, identifier)
+    else:
+        user = await _fetch_by(db, User.username, identifier)
+
+    if user is not None:
+        user_cache.set(identifier, user)
+    return user
+
+
+def _invalidate_on_change(mapper, connection, target) -> None:
+    user_cache.invalidate_user(target.id)
+
+
+# UPDATE / DELETE qua ORM (session.flush) tự xóa cache của user đó
+event.listen(User, "after_update", _invalidate_on_change)
+event.listen(User, "after_delete", _invalidate_on_change)
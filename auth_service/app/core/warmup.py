@@ -0,0 +1,75 @@
+"""
+Background warm-up for Auth Service
+Parse signing key, dựng JWKS và load backend hash password sau khi service đã khởi động
+(thay vì lúc import module). GET /ready chỉ trả 200 khi warm-up xong và DB trả lời được.
+"""
+
+import asyncio
+import time
+from typing import Optional
+
+from sqlalchemy import text
+
+from app.core.password_pool import password_pool
+from app.core.security import load_hash_backends, read_bcrypt_rounds
+from app.core.signer import get_jwks, get_signer, get_verification_keys
+from app.db.database import async_engine
+
+
+class WarmupState:
+    """Kết quả warm-up, đọc bởi GET /ready"""
+
+    def __init__(self):
+        self.ready = False
+        self.error: Optional[str] = None
+        self.duration: Optional[float] = None
+
+
+def load_keys() -> None:
+    """Parse private key (ALGORITHM không khớp loại key thì lỗi ở đây) và dựng JWKS"""
+    get_signer()
+    get_jwks()
+    get_verification_keys()
+
+
+def preload() -> None:
+    """Chạy trong master process trước khi fork worker (gunicorn preload_app)
+    
+    Key đã parse và backend hash nằm trong vùng nhớ dùng chung (copy-on-write) của mọi worker;
+    warm_up() trong worker chỉ lấy lại từ cache. Không tạo thread / pool / connection ở đây.
+    Rounds bcrypt chưa calibrate (BCRYPT_ROUNDS=0, chưa có file) thì không hash trong master:
+    warm_up() của worker calibrate ở background.
+    """
+    load_keys()
+    if read_bcrypt_rounds() is not None:
+        load_hash_backends()
+
+
+async def warm_up(state: WarmupState) -> None:
+    """Load key (thread) và backend hash trong password pool (khởi động luôn các worker)"""
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(
+            asyncio.to_thread(load_keys),
+            password_pool.run(load_hash_backends),
+        )
+    except Exception as e:
+        state.error = f"{type(e).__name__}: {e}"
+        print(f"Warm-up failed: {state.error}")
+        return
+    state.duration = time.perf_counter() - start
+    state.ready = True
+
+
+async def check_database() -> Optional[str]:
+    """SELECT 1 qua async pool; trả về lỗi (hoặc None nếu DB trả lời được)"""
+    try:
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+    return None
+
+
+# Global warm-up state
+warmup_state = WarmupState()
@@ -0,0 +1,17 @@
+"""
+Database seed CLI
+Tạo bảng và dữ liệu ban đầu (tạo user admin mặc định (admin/admin123)).
+Chạy một lần khi cài đặt / deploy, service không seed lúc khởi động:
+
+    python -m app.db.seed
+"""
+
+from app.db.database import init_db
+
+
+def main():
+    init_db()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,16 +3,47 @@ Auth Service - Entry point FastAPI
 Xử lý authentication và authorization với RSA JWT
 """
 
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from app.api.routes_auth import router as auth_router
+from app.api.routes_keys import router as keys_router
 from app.core.config import settings
-from app.db.database import init_db
+from app.core.metrics import CONTENT_TYPE, MetricsMiddleware, multiprocess_metrics
+from app.core.password_pool import password_pool
+from app.core.refresh_tokens import prune_expired_tokens_periodically
+from app.core.warmup import check_database, warm_up, warmup_state
+from app.db.database import async_engine, create_tables
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Khởi động / tắt service
+    
+    Không làm gì lúc import module: tạo bảng khi khởi động (seed data chạy riêng bằng
+    python -m app.db.seed), load key và backend hash ở background (xem GET /ready).
+    """
+    await asyncio.to_thread(create_tables)
+    app.state.warmup = asyncio.create_task(warm_up(warmup_state))
+    # Task xóa refresh token / jti thu hồi đã hết hạn
+    app.state.refresh_token_pruner = asyncio.create_task(prune_expired_tokens_periodically())
+    multiprocess_metrics.start()
+    
+    yield
+    
+    app.state.refresh_token_pruner.cancel()
+    app.state.warmup.cancel()
+    # Dừng password hashing pool, thread ghi metrics và đóng các connection trong async pool
+    multiprocess_metrics.stop()
+    password_pool.shutdown()
+    await async_engine.dispose()
 
 app = FastAPI(
     title="Authentication Service",
     description="RSA JWT Authentication Service",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -24,11 +55,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize database
-init_db()
+# Metrics middleware (latency theo route)
+app.add_middleware(MetricsMiddleware)
 
 # Include routers
 app.include_router(auth_router, prefix="/auth", tags=["authentication"])
+app.include_router(keys_router, tags=["keys"])
 
 @app.get("/")
 async def root():
@@ -37,9 +69,37 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
+    """Health check endpoint (liveness: process còn chạy)"""
     return {"status": "healthy", "service": "auth_service"}
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: 200 khi warm-up xong và DB trả lời được, ngược lại 503"""
+    if not warmup_state.ready:
+        return JSONResponse(
+            status_code=503,
+            content={
+                "status": "failed" if warmup_state.error else "starting",
+                "service": "auth_service",
+                "error": warmup_state.error,
+            },
+        )
+    
+    db_error = await check_database()
+    if db_error:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "unavailable", "service": "auth_service", "error": db_error},
+        )
+    return {"status": "ready", "service": "auth_service"}
+
+# METRICS_ENABLED=false: không mở endpoint (404)
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        """Prometheus metrics endpoint (tổng của mọi worker khi có METRICS_MULTIPROC_DIR; đọc file nên chạy trong threadpool)"""
+        return Response(content=multiprocess_metrics.render(), media_type=CONTENT_TYPE)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,25 @@
+"""
+Refresh token model for Auth Service
+Lưu hash (SHA-256) của refresh token, không lưu token gốc
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy.sql import func
+
+from app.models.user import Base
+
+class RefreshToken(Base):
+    """Refresh token (opaque), xoay vòng mỗi lần dùng"""
+    __tablename__ = "refresh_tokens"
+    
+    id = Column(Integer, primary_key=True)
+    token_hash = Column(String(64), unique=True, index=True, nullable=False)
+    # Các token sinh ra từ cùng một lần login chung family_id (dùng để thu hồi cả chuỗi khi phát hiện reuse)
+    family_id = Column(String(32), index=True, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False)
+    expires_at = Column(DateTime, index=True, nullable=False)  # UTC
+    revoked_at = Column(DateTime, nullable=True)  # UTC, set khi đã xoay vòng / logout
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    def __repr__(self):
+        return f"<RefreshToken(id={self.id}, user_id={self.user_id}, family_id='{self.family_id}')>"
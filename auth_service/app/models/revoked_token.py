@@ -0,0 +1,23 @@
+"""
+Revoked token model for Auth Service
+Danh sách jti của access token đã bị thu hồi trước khi hết hạn
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+
+from app.models.user import Base
+
+class RevokedToken(Base):
+    """Access token đã bị thu hồi (giữ tới khi token hết hạn)"""
+    __tablename__ = "revoked_tokens"
+    # id tăng dần, không dùng lại sau khi xóa -> resource service đồng bộ theo id (since=...)
+    __table_args__ = {"sqlite_autoincrement": True}
+    
+    id = Column(Integer, primary_key=True)
+    jti = Column(String(64), unique=True, index=True, nullable=False)
+    expires_at = Column(DateTime, index=True, nullable=False)  # UTC, = exp của token
+    revoked_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    def __repr__(self):
+        return f"<RevokedToken(id={self.id}, jti='{self.jti}')>"
@@ -5,6 +5,7 @@ LoginRequest, TokenResponse, và các schemas khác
 
 from pydantic import BaseModel, EmailStr, Field, field_validator
 from datetime import datetime
+from typing import List, Optional
 
 class LoginRequest(BaseModel):
     """Login request schema"""
@@ -43,4 +44,24 @@ class TokenResponse(BaseModel):
     access_token: str
     token_type: str = "bearer"
     expires_in: int
+    refresh_token: Optional[str] = None  # Cũng được set trong cookie HttpOnly
+    refresh_expires_in: Optional[int] = None
 
+class RefreshRequest(BaseModel):
+    """Refresh request schema (bỏ trống nếu gửi refresh token qua cookie)"""
+    refresh_token: Optional[str] = None
+
+class RevokeRequest(BaseModel):
+    """Revoke request schema"""
+    token: str  # Access token cần thu hồi
+
+class RevocationEntry(BaseModel):
+    """Một access token đã bị thu hồi"""
+    id: int
+    jti: str
+    exp: int
+
+class RevocationFeed(BaseModel):
+    """Feed các token bị thu hồi (đồng bộ tăng dần theo id)"""
+    revocations: List[RevocationEntry]
+    last_id: int
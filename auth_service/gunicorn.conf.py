@@ -0,0 +1,61 @@
+"""
+Gunicorn config cho Auth Service (chế độ production, nhiều process)
+    gunicorn app.main:app -c gunicorn.conf.py
+
+- Worker uvicorn (uvloop + httptools khi cài uvicorn[standard]), không --reload
+- Số worker tự tính theo số CPU thực sự được cấp (cgroup / affinity), ghi đè bằng WEB_CONCURRENCY
+- preload_app: import app và parse key trong master trước khi fork, các worker dùng chung
+  vùng nhớ đó (copy-on-write). Cache (user, token) vẫn riêng từng worker.
+- Master tạo bảng một lần trước khi fork; rate limit (sqlite) và metrics gộp dùng chung giữa worker
+"""
+
+import gc
+import os
+
+def available_cpus() -> int:
+    """Số CPU process được dùng: affinity, giới hạn bởi CPU quota của cgroup v2 (docker --cpus)"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        with open("/sys/fs/cgroup/cpu.max", "r", encoding="utf-8") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, int(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+# Hash password tốn CPU: mỗi worker một process, không cần nhiều hơn số CPU
+workers = int(os.environ.get("WEB_CONCURRENCY") or available_cpus())
+worker_class = "uvicorn.workers.UvicornWorker"
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+preload_app = True
+timeout = 30
+graceful_timeout = 30
+keepalive = 5
+loglevel = os.environ.get("LOG_LEVEL", "info")
+
+# Chia CPU cho password pool của từng worker (tổng số thread hash ~ số CPU)
+os.environ.setdefault("PASSWORD_HASH_WORKERS", str(max(1, available_cpus() // workers)))
+
+# Rate limit login tính chung cho mọi worker (backend "memory" cho mỗi worker một bộ đếm riêng:
+# N worker = N lần số lần thử cho phép)
+os.environ.setdefault("RATE_LIMIT_BACKEND", "sqlite")
+
+# GET /metrics ở worker nào cũng trả tổng của mọi worker (xem app.core.metrics.MultiprocessMetrics)
+os.environ.setdefault("METRICS_MULTIPROC_DIR", "data/metrics")
+
+def on_starting(server):
+    """Trong master, sau khi preload app và trước khi fork worker"""
+    from app.core.metrics import multiprocess_metrics
+    from app.core.warmup import preload
+    from app.db.database import create_tables, engine
+    # DDL chạy một lần ở đây, không chạy đồng thời trong lifespan của mọi worker
+    create_tables()
+    engine.dispose()  # Không để worker thừa hưởng connection SQLite của master
+    multiprocess_metrics.clear()
+    preload()
+    # Đưa các object đã có vào vùng permanent: GC của worker không chạm vào -> không copy trang nhớ
+    gc.freeze()
@@ -0,0 +1,50 @@
+"""
+Alembic environment for Auth Service
+Dùng engine của app (cùng DATABASE_URL và PRAGMA SQLite) và metadata của các model
+"""
+
+from logging.config import fileConfig
+
+from alembic import context
+
+from app.core.config import settings
+from app.db.database import engine
+from app.models.user import Base
+import app.models.refresh_token  # noqa: F401  (đăng ký bảng refresh_tokens)
+import app.models.revoked_token  # noqa: F401  (đăng ký bảng revoked_tokens)
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = Base.metadata
+
+
+def run_migrations_offline() -> None:
+    """Sinh SQL (alembic upgrade head --sql) mà không kết nối DB"""
+    context.configure(
+        url=settings.DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        render_as_batch=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    # render_as_batch: SQLite không hỗ trợ phần lớn ALTER TABLE
+    with engine.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            render_as_batch=True,
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
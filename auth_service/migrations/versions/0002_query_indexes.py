@@ -0,0 +1,36 @@
+"""query indexes
+
+Bỏ index thừa trên cột id: id là INTEGER PRIMARY KEY (rowid) nên SQLite đã tra theo id
+mà không cần index, index riêng chỉ làm chậm mỗi lần INSERT (login, refresh, revoke).
+Các query nóng đã dùng đúng index (kiểm tra bằng benchmarks/check_query_plans.py):
+- login: MULTI-INDEX OR trên ix_users_username / ix_users_email
+- refresh: ix_refresh_tokens_token_hash, thu hồi family: ix_refresh_tokens_family_id
+- feed thu hồi: rowid > since, dọn token hết hạn: ix_*_expires_at
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:00
+"""
+
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+REDUNDANT_ID_INDEXES = (
+    ("ix_users_id", "users"),
+    ("ix_refresh_tokens_id", "refresh_tokens"),
+    ("ix_revoked_tokens_id", "revoked_tokens"),
+)
+
+
+def upgrade() -> None:
+    for index_name, table_name in REDUNDANT_ID_INDEXES:
+        op.drop_index(index_name, table_name=table_name, if_exists=True)
+
+
+def downgrade() -> None:
+    for index_name, table_name in REDUNDANT_ID_INDEXES:
+        op.create_index(index_name, table_name, ["id"], if_not_exists=True)
@@ -0,0 +1,82 @@
+"""
+Benchmark: ký (TokenSigner của auth_service) và verify (PyJWT với key đã parse,
+giống resource_service) access token với RS256, ES256 và EdDSA
+
+Chạy từ thư mục gốc của project:
+    python benchmarks/bench_jwt_algorithms.py --iterations 2000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import jwt as pyjwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "auth_service"))
+
+ALGORITHMS = ("RS256", "ES256", "EdDSA")
+
+
+def generate_private_pem(algorithm: str) -> str:
+    """Tạo private key PKCS8 PEM giống generate_keys.py"""
+    if algorithm == "ES256":
+        private_key = ec.generate_private_key(ec.SECP256R1())
+    elif algorithm == "EdDSA":
+        private_key = ed25519.Ed25519PrivateKey.generate()
+    else:
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    return private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption(),
+    ).decode("utf-8")
+
+
+def ops_per_second(fn, iterations: int) -> float:
+    """Số lần gọi fn mỗi giây"""
+    fn()  # warm-up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return iterations / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--algorithms", nargs="+", choices=ALGORITHMS, default=list(ALGORITHMS))
+    args = parser.parse_args()
+
+    from app.core.signer import TokenSigner
+
+    now = int(time.time())
+    claims = {
+        "sub": "1",
+        "username": "admin",
+        "email": "admin@example.com",
+        "is_admin": True,
+        "exp": now + 1800,
+        "iat": now,
+        "iss": "auth_service",
+    }
+
+    print(f"{'algorithm':<10}{'sign ops/s':>14}{'verify ops/s':>14}{'token bytes':>13}")
+    for algorithm in args.algorithms:
+        signer = TokenSigner(generate_private_pem(algorithm), algorithm)
+        public_key = signer.private_key.public_key()
+        token = signer.sign(claims)
+
+        sign_rate = ops_per_second(lambda: signer.sign(claims), args.iterations)
+        verify_rate = ops_per_second(
+            lambda: pyjwt.decode(token, public_key, algorithms=[algorithm]),
+            args.iterations,
+        )
+        print(f"{algorithm:<10}{sign_rate:>14.0f}{verify_rate:>14.0f}{len(token):>13}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Benchmark: tìm kiếm sản phẩm bằng ILIKE '%term%' so với FTS5 (products_fts)
+trên catalog sinh ngẫu nhiên
+
+Chạy từ thư mục gốc của project:
+    python benchmarks/bench_product_search.py --rows 1000000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "resource_service"))
+
+ADJECTIVES = ["Gaming", "Pro", "Mini", "Ultra", "Classic", "Smart", "Wireless", "Portable", "Premium", "Eco"]
+NOUNS = ["Laptop", "Phone", "Headphone", "Keyboard", "Mouse", "Monitor", "Camera", "Watch", "Speaker", "Shoes"]
+BRANDS = ["Acme", "Nova", "Zenith", "Orion", "Vertex", "Lumen", "Apex", "Nimbus"]
+CATEGORIES = ["Electronics", "Fashion", "Home", "Sports", "Books"]
+
+
+def generate_rows(count: int, seed: int = 42):
+    """Sinh dữ liệu sản phẩm giả"""
+    rng = random.Random(seed)
+    for i in range(count):
+        name = f"{rng.choice(BRANDS)} {rng.choice(NOUNS)} {rng.choice(ADJECTIVES)} {i}"
+        description = f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS).lower()} by {rng.choice(BRANDS)}"
+        yield (name, description, round(rng.uniform(10, 5000), 2), rng.choice(CATEGORIES), 1, rng.randint(0, 500))
+
+
+def populate(engine, rows: int, batch_size: int = 50000):
+    """Insert rows bằng executemany (triggers FTS vẫn chạy như khi ghi thật)"""
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        batch = []
+        for row in generate_rows(rows):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                cursor.executemany(
+                    "INSERT INTO products (name, description, price, category, is_active, stock_quantity) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    batch,
+                )
+                batch.clear()
+        if batch:
+            cursor.executemany(
+                "INSERT INTO products (name, description, price, category, is_active, stock_quantity) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                batch,
+            )
+        raw.commit()
+    finally:
+        raw.close()
+
+
+def measure(fn, repeat: int) -> float:
+    """Thời gian trung bình (giây) mỗi lần chạy fn"""
+    fn()  # warm-up (page cache)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--size", type=int, default=10, help="page size")
+    parser.add_argument("--terms", nargs="+", default=["laptop", "zenith phone", "wireless", "nimbus watch 4242"])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+
+        from sqlalchemy import func, select
+        from app.db.database import SessionLocal, create_tables, engine
+        from app.db import search as product_search
+        from app.models.product import Product
+
+        create_tables()
+        start = time.perf_counter()
+        populate(engine, args.rows)
+        print(f"populated {args.rows} rows in {time.perf_counter() - start:.1f}s (FTS5 enabled: {product_search.fts_enabled})")
+
+        db = SessionLocal()
+        try:
+            # Cùng dạng query với GET /api/products: Select + COUNT trên subquery
+            base = select(Product).where(Product.is_active == True)
+
+            def count(query):
+                return db.scalar(select(func.count()).select_from(query.subquery()))
+
+            def run_ilike(term):
+                query = base.where(Product.name.ilike(f"%{term}%"))
+                count(query)
+                return db.scalars(query.order_by(Product.id).limit(args.size)).all()
+
+            def run_fts(term):
+                query, _ = product_search.apply_search(base, term)
+                count(query)
+                return db.scalars(product_search.order_by_rank(query).limit(args.size)).all()
+
+            print(f"{'term':<22}{'ILIKE ms':>12}{'FTS5 ms':>12}{'speedup':>10}")
+            for term in args.terms:
+                ilike_cost = measure(lambda: run_ilike(term), args.repeat)
+                fts_cost = measure(lambda: run_fts(term), args.repeat)
+                print(f"{term:<22}{ilike_cost * 1e3:>12.2f}{fts_cost * 1e3:>12.2f}{ilike_cost / fts_cost:>9.1f}x")
+        finally:
+            db.close()
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
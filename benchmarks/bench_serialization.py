@@ -0,0 +1,91 @@
+"""
+Benchmark: chi phí dựng + serialize một trang GET /api/products (size=100)
+
+- orm_pydantic:  ORM object -> ProductListResponse (from_attributes) -> FastAPI validate lại
+                 theo response_model -> JSONResponse (json của stdlib)  [cách cũ của FastAPI]
+- model_dump:    ORM object -> ProductListResponse -> model_dump_json()  [trước thay đổi này]
+- rows_orjson:   row mapping -> dict -> dumps() (orjson nếu có)          [hiện tại]
+
+Chỉ đo phần CPU sau khi query (rows đã fetch sẵn), cùng một trang dữ liệu cho mọi cách.
+Output của các cách được so sánh để chắc chắn JSON giống nhau.
+
+Chạy từ thư mục gốc của project:
+    python benchmarks/bench_serialization.py --size 100 --repeat 2000
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "resource_service"))
+
+
+def measure(fn, repeat: int) -> float:
+    """Thời gian trung bình (giây) mỗi lần chạy fn"""
+    fn()  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100, help="page size")
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+
+        from fastapi.encoders import jsonable_encoder
+        from fastapi.responses import JSONResponse
+        from sqlalchemy import select
+        from bench_product_search import populate
+        from app.core import serialization
+        from app.db.database import SessionLocal, create_tables, engine
+        from app.db.export import EXPORT_COLUMNS
+        from app.models.product import Product
+        from app.schemas.product import ProductListResponse
+
+        create_tables()
+        populate(engine, args.size * 10)
+
+        db = SessionLocal()
+        try:
+            orm_products = db.scalars(select(Product).order_by(Product.id).limit(args.size)).all()
+            rows = db.execute(select(*EXPORT_COLUMNS).order_by(Product.id).limit(args.size)).mappings().all()
+        finally:
+            db.close()
+            engine.dispose()
+        page = {"total": args.size * 10, "page": 1, "size": args.size, "next_cursor": "eyJpZCI6MTAwfQ"}
+
+        def orm_pydantic() -> bytes:
+            product_list = ProductListResponse(products=orm_products, **page)
+            validated = ProductListResponse.model_validate(product_list.model_dump())
+            return JSONResponse(content=jsonable_encoder(validated)).body
+
+        def model_dump() -> bytes:
+            return ProductListResponse(products=orm_products, **page).model_dump_json().encode("utf-8")
+
+        def rows_orjson() -> bytes:
+            return serialization.dumps({"products": [dict(row) for row in rows], **page})
+
+        expected = json.loads(model_dump())
+        for fn in (orm_pydantic, rows_orjson):
+            assert json.loads(fn()) == expected, f"{fn.__name__}: output khác model_dump_json()"
+
+        print(f"size={args.size}, orjson: {serialization.orjson is not None}")
+        print(f"{'path':<16}{'µs / page':>12}{'speedup':>10}")
+        baseline = measure(orm_pydantic, args.repeat)
+        for fn in (orm_pydantic, model_dump, rows_orjson):
+            cost = baseline if fn is orm_pydantic else measure(fn, args.repeat)
+            print(f"{fn.__name__:<16}{cost * 1e6:>12.1f}{baseline / cost:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
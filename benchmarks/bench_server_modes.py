@@ -0,0 +1,128 @@
+"""
+Benchmark: throughput qua HTTP thật của các cách chạy server
+
+- reload:   uvicorn --reload (CMD cũ của Dockerfile: một process + file watcher)
+- single:   uvicorn, một process, không reload
+- gunicorn: gunicorn -c gunicorn.conf.py (worker uvicorn, preload key, số worker tự tính
+            hoặc theo --workers)
+
+Kịch bản: POST /auth/login (bcrypt, CPU-bound) và GET /api/products (verify JWT + DB + JSON,
+tắt product cache). Load generator (httpx) chạy trên cùng máy nên cũng chiếm CPU:
+so sánh tương đối giữa các mode, không phải số tuyệt đối của production.
+
+Chạy từ thư mục gốc của project (Linux / Docker, gunicorn không chạy trên Windows):
+    python benchmarks/bench_server_modes.py --requests 2000 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODES = ("reload", "single", "gunicorn")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def server_command(mode: str, port: int, workers: int) -> list:
+    if mode == "gunicorn":
+        command = [sys.executable, "-m", "gunicorn", "app.main:app", "-c", "gunicorn.conf.py",
+                   "--bind", f"127.0.0.1:{port}", "--log-level", "warning"]
+        if workers:
+            command += ["--workers", str(workers)]
+        return command
+    command = [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"]
+    if mode == "reload":
+        command.append("--reload")
+    return command
+
+
+def wait_ready(port: int, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/ready", timeout=2):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server trên port {port} không ready sau {timeout}s")
+
+
+async def load(url: str, method: str, args, **kwargs) -> dict:
+    import httpx
+    from bench_suite import run_scenario
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+
+        async def request(i):
+            return (await client.request(method, url, **kwargs)).status_code == 200
+
+        return await run_scenario(request, args.requests, args.concurrency)
+
+
+def run_mode(service: str, mode: str, env: dict, args) -> dict:
+    """Khởi động server ở mode đã chọn, đo một kịch bản rồi tắt server"""
+    port = free_port()
+    process = subprocess.Popen(
+        server_command(mode, port, args.workers),
+        cwd=os.path.join(ROOT_DIR, f"{service}_service"),
+        env={**os.environ, **env},
+        start_new_session=True,  # --reload / gunicorn có process con: tắt cả nhóm
+    )
+    try:
+        wait_ready(port)
+        base = f"http://127.0.0.1:{port}"
+        if service == "auth":
+            return asyncio.run(load(f"{base}/auth/login", "POST", args,
+                                    json={"username": "admin", "password": "admin123"}))
+        return asyncio.run(load(f"{base}/api/products?size=20", "GET", args,
+                                headers={"Authorization": f"Bearer {env['BENCH_TOKEN']}"}))
+    finally:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=0, help="Số worker gunicorn (0 = tự tính theo CPU)")
+    parser.add_argument("--services", nargs="+", choices=("auth", "resource"), default=["auth", "resource"])
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    args = parser.parse_args()
+
+    import jwt as pyjwt
+    from bench_startup import prepare_environment
+
+    print(f"CPU: {os.cpu_count()}, requests: {args.requests}, concurrency: {args.concurrency}")
+    print(f"{'service':<10}{'mode':<10}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        env = prepare_environment(tmp)
+        env["auth"]["LOGIN_RATE_LIMIT_ENABLED"] = "false"  # Mọi request cùng một IP / username
+        env["resource"]["PRODUCT_CACHE_ENABLED"] = "false"  # Đo DB + serialize thật
+        with open(env["auth"]["PRIVATE_KEY_PATH"], "rb") as f:
+            now = int(time.time())
+            env["resource"]["BENCH_TOKEN"] = pyjwt.encode(
+                {"sub": "1", "username": "bench", "exp": now + 3600, "iat": now}, f.read(), algorithm="RS256",
+            )
+        for service in args.services:
+            for mode in args.modes:
+                result = run_mode(service, mode, env[service], args)
+                print(f"{service:<10}{mode:<10}{result['throughput_rps']:>10}{result['p50_ms']:>10}"
+                      f"{result['p99_ms']:>10}{result['errors']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Benchmark: thời gian khởi động của auth_service và resource_service
+
+- import:    `import app.main`
+- accepting: tới khi app nhận request (import + phần startup chạy trước khi lifespan yield)
+- ready:     tới khi GET /ready trả 200 (warm-up ở background đã xong)
+
+Mode "eager" chạy lại các bước trước đây nằm ở import / startup (init_db + seed, hash thử
+"init_test", load key / JWKS đồng bộ) để so sánh với mode "lazy" hiện tại.
+Mỗi lần đo là một process mới trên DB đã seed sẵn (giống mỗi lần worker boot / --reload).
+
+Chạy từ thư mục gốc của project:
+    python benchmarks/bench_startup.py --repeat 5
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVICES = ("auth", "resource")
+MODES = ("eager", "lazy")
+
+# ==============================================================
+#  Worker (process con)
+# ==============================================================
+
+async def measure_startup(service: str, mode: str) -> dict:
+    start = time.perf_counter()
+    from app.main import app
+    imported = time.perf_counter()
+
+    if mode == "eager":
+        from app.db.database import init_db
+        init_db()
+        if service == "auth":
+            from app.core.security import get_password_context
+            from app.core.signer import get_signer
+            get_password_context().hash("init_test")
+            get_signer()
+        else:
+            from app.core.jwks import jwks_cache
+            from app.core.revocation import revocation_sync
+            jwks_cache.start()
+            revocation_sync.start()
+            revocation_sync.stop()
+            jwks_cache.stop()
+        accepting = ready = time.perf_counter()
+    else:
+        async with app.router.lifespan_context(app):
+            accepting = time.perf_counter()
+            await app.state.warmup
+            ready = time.perf_counter()
+
+    return {
+        "import_ms": (imported - start) * 1e3,
+        "accepting_ms": (accepting - start) * 1e3,
+        "ready_ms": (ready - start) * 1e3,
+    }
+
+# ==============================================================
+#  Orchestrator
+# ==============================================================
+
+def prepare_environment(tmp: str) -> dict:
+    """Key tạm + DB đã seed cho cả hai service"""
+    from cryptography.hazmat.primitives import serialization
+    from bench_suite import write_private_key
+
+    private_key_path = write_private_key(tmp)
+    with open(private_key_path, "rb") as f:
+        private_key = serialization.load_pem_private_key(f.read(), password=None)
+    public_key_path = os.path.join(tmp, "public.pem")
+    with open(public_key_path, "wb") as f:
+        f.write(private_key.public_key().public_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PublicFormat.SubjectPublicKeyInfo,
+        ))
+
+    env = {
+        "auth": {
+            "DATABASE_URL": f"sqlite:///{os.path.join(tmp, 'auth.db')}",
+            "PRIVATE_KEY_PATH": private_key_path,
+            "RETIRED_KEYS_DIR": os.path.join(tmp, "retired"),
+        },
+        "resource": {
+            "DATABASE_URL": f"sqlite:///{os.path.join(tmp, 'resource.db')}",
+            "PUBLIC_KEY_PATH": public_key_path,
+            "JWKS_PATH": os.path.join(tmp, "jwks.json"),
+            "JWKS_REFRESH_SECONDS": "0",
+            "REVOCATION_FEED_PATH": os.path.join(tmp, "revocations.ndjson"),
+            "REVOCATION_POLL_SECONDS": "0",
+        },
+    }
+    for service in SERVICES:
+        subprocess.run(
+            [sys.executable, "-m", "app.db.seed"],
+            cwd=os.path.join(ROOT_DIR, f"{service}_service"),
+            env={**os.environ, **env[service]},
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+    return env
+
+
+def run_worker(service: str, mode: str, env: dict) -> dict:
+    """Một lần khởi động trong process mới"""
+    with tempfile.NamedTemporaryFile("r", suffix=".json", delete=False) as f:
+        result_path = f.name
+    try:
+        subprocess.run(
+            [sys.executable, os.path.abspath(__file__),
+             "--worker", service, "--mode", mode, "--worker-output", result_path],
+            cwd=os.path.join(ROOT_DIR, f"{service}_service"),
+            env={**os.environ, **env},
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+        with open(result_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    finally:
+        os.remove(result_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="Số lần khởi động mỗi service / mode (lấy median)")
+    parser.add_argument("--services", nargs="+", choices=SERVICES, default=list(SERVICES))
+    parser.add_argument("--output", help="Ghi kết quả ra file JSON")
+    parser.add_argument("--worker", choices=SERVICES, help=argparse.SUPPRESS)
+    parser.add_argument("--mode", choices=MODES, default="lazy", help=argparse.SUPPRESS)
+    parser.add_argument("--worker-output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        sys.path.insert(0, os.path.join(ROOT_DIR, f"{args.worker}_service"))
+        result = asyncio.run(measure_startup(args.worker, args.mode))
+        with open(args.worker_output, "w", encoding="utf-8") as f:
+            json.dump(result, f)
+        return
+
+    results = {}
+    print(f"{'service':<10}{'mode':<8}{'import ms':>12}{'accepting ms':>15}{'ready ms':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        env = prepare_environment(tmp)
+        for service in args.services:
+            for mode in MODES:
+                runs = [run_worker(service, mode, env[service]) for _ in range(args.repeat)]
+                summary = {key: round(statistics.median(run[key] for run in runs), 1) for key in runs[0]}
+                results[f"{service}_{mode}"] = summary
+                print(f"{service:<10}{mode:<8}{summary['import_ms']:>12}{summary['accepting_ms']:>15}{summary['ready_ms']:>12}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,357 @@
+"""
+Benchmark suite: throughput và latency (p50/p90/p99) của login, register, verify_token
+và /api/products (filter, trang sâu, cursor), chạy in-process qua ASGI với dữ liệu sinh sẵn.
+Kết quả ghi ra JSON để so sánh giữa các lần chạy.
+
+Chạy từ thư mục gốc của project:
+    python benchmarks/bench_suite.py --output benchmarks/results/baseline.json
+    python benchmarks/bench_suite.py --compare benchmarks/results/baseline.json
+
+Mỗi service chạy trong một process con riêng (hai service cùng dùng package `app`).
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+AUTH_SCENARIOS = ("login", "register")
+RESOURCE_SCENARIOS = (
+    "verify_token",
+    "verify_token_cached",
+    "products_page1",
+    "products_deep_page",
+    "products_deep_cursor",
+    "products_category",
+    "products_search",
+)
+BENCH_PASSWORD = "bench-password"
+
+# ==============================================================
+#  Đo và tổng hợp
+# ==============================================================
+
+def summarize(latencies, errors: int, wall: float) -> dict:
+    """Throughput và các percentile (ms, nearest-rank)"""
+    ordered = sorted(latencies)
+
+    def percentile(p):
+        return ordered[min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))] * 1e3
+
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "throughput_rps": round(len(ordered) / wall, 1),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1e3, 3),
+        "p50_ms": round(percentile(50), 3),
+        "p90_ms": round(percentile(90), 3),
+        "p99_ms": round(percentile(99), 3),
+        "max_ms": round(ordered[-1] * 1e3, 3),
+    }
+
+
+async def run_scenario(make_request, total: int, concurrency: int, warmup: int = 10) -> dict:
+    """Chạy `total` request với `concurrency` client đồng thời; make_request(i) trả về True nếu thành công"""
+    for i in range(min(warmup, total)):
+        await make_request(-1 - i)
+
+    latencies = []
+    errors = 0
+    indexes = iter(range(total))
+
+    async def client():
+        nonlocal errors
+        for i in indexes:
+            start = time.perf_counter()
+            ok = await make_request(i)
+            latencies.append(time.perf_counter() - start)
+            if not ok:
+                errors += 1
+
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - wall_start)
+
+
+def write_private_key(directory: str) -> str:
+    """RSA 2048 private key tạm (PKCS8 PEM)"""
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    path = os.path.join(directory, "private.pem")
+    with open(path, "wb") as f:
+        f.write(private_key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption(),
+        ))
+    return path
+
+# ==============================================================
+#  Auth Service worker
+# ==============================================================
+
+async def bench_auth(args, tmp: str) -> dict:
+    os.environ.update({
+        "DATABASE_URL": f"sqlite:///{os.path.join(tmp, 'auth.db')}",
+        "PRIVATE_KEY_PATH": write_private_key(tmp),
+        "RETIRED_KEYS_DIR": os.path.join(tmp, "retired"),
+        "PASSWORD_HASH_MAX_PENDING": str(max(64, args.concurrency * 2)),
+        # Mọi request đến từ cùng một client: tắt rate limit để đo chính login
+        "LOGIN_RATE_LIMIT_ENABLED": "false",
+    })
+    sys.path.insert(0, os.path.join(ROOT_DIR, "auth_service"))
+
+    import httpx
+    from sqlalchemy import insert
+    from app.core.security import get_password_hash
+    from app.db.database import SessionLocal, create_tables
+    from app.main import app
+    from app.models.user import User
+
+    create_tables()
+    # Sinh user (dùng chung một hash để seed nhanh; login vẫn verify bcrypt đầy đủ)
+    hashed = get_password_hash(BENCH_PASSWORD)
+    db = SessionLocal()
+    try:
+        db.execute(insert(User), [
+            {"username": f"bench{i}", "email": f"bench{i}@example.com", "hashed_password": hashed,
+             "is_active": True, "is_admin": False}
+            for i in range(args.users)
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        await app.state.warmup  # Đo khi service đã ready
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+            async def login(i):
+                response = await client.post("/auth/login", json={
+                    "username": f"bench{i % args.users}", "password": BENCH_PASSWORD,
+                })
+                return response.status_code == 200
+
+            async def register(i):
+                response = await client.post("/auth/register", json={
+                    "username": f"new{i}", "email": f"new{i}@example.com", "password": BENCH_PASSWORD,
+                })
+                return response.status_code == 200
+
+            scenarios = {"login": login, "register": register}
+            for name in args.scenarios:
+                if name in scenarios:
+                    results[name] = await run_scenario(scenarios[name], args.requests, args.concurrency)
+                    print(f"  {name:<22} {results[name]['throughput_rps']:>9} req/s  p99 {results[name]['p99_ms']} ms", file=sys.stderr)
+    return results
+
+# ==============================================================
+#  Resource Service worker
+# ==============================================================
+
+async def bench_resource(args, tmp: str) -> dict:
+    import jwt as pyjwt
+    from cryptography.hazmat.primitives import serialization
+
+    private_key_path = write_private_key(tmp)
+    with open(private_key_path, "rb") as f:
+        private_key = serialization.load_pem_private_key(f.read(), password=None)
+    public_key_path = os.path.join(tmp, "public.pem")
+    with open(public_key_path, "wb") as f:
+        f.write(private_key.public_key().public_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PublicFormat.SubjectPublicKeyInfo,
+        ))
+    os.environ.update({
+        "DATABASE_URL": f"sqlite:///{os.path.join(tmp, 'resource.db')}",
+        "PUBLIC_KEY_PATH": public_key_path,
+        "JWKS_PATH": os.path.join(tmp, "jwks.json"),
+        "JWKS_REFRESH_SECONDS": "0",
+        "REVOCATION_FEED_PATH": os.path.join(tmp, "revocations.ndjson"),
+        "REVOCATION_POLL_SECONDS": "0",
+        # Mặc định đo truy vấn DB thật, không đo response cache
+        "PRODUCT_CACHE_ENABLED": "true" if args.product_cache else "false",
+    })
+    sys.path.insert(0, os.path.join(ROOT_DIR, "resource_service"))
+
+    import httpx
+    from bench_product_search import populate
+    from app.core.security import verify_token
+    from app.db.database import create_tables, engine
+    from app.main import app
+
+    create_tables()
+    populate(engine, args.products)
+
+    def make_token(i: int) -> str:
+        now = int(time.time())
+        return pyjwt.encode(
+            {"sub": "1", "username": "bench", "exp": now + 3600, "iat": now, "jti": f"bench-{i}"},
+            private_key,
+            algorithm="RS256",
+        )
+
+    results = {}
+    token = make_token(0)
+    headers = {"Authorization": f"Bearer {token}"}
+    page_size = 20
+    deep_page = max(1, args.products // page_size // 2)
+    middle_id = args.products // 2
+    deep_cursor = base64.urlsafe_b64encode(json.dumps({"id": middle_id}).encode()).decode().rstrip("=")
+    product_queries = {
+        "products_page1": f"/api/products?page=1&size={page_size}",
+        "products_deep_page": f"/api/products?page={deep_page}&size={page_size}",
+        "products_deep_cursor": f"/api/products?cursor={deep_cursor}&size={page_size}",
+        "products_category": f"/api/products?category=Electronics&size={page_size}",
+        "products_search": f"/api/products?search=zenith%20phone&size={page_size}",
+    }
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        await app.state.warmup  # Đo khi service đã ready
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as client:
+            for name in args.scenarios:
+                if name == "verify_token":
+                    # Mỗi request một token khác nhau -> luôn verify chữ ký (cache miss)
+                    tokens = [make_token(i) for i in range(args.requests + 10)]
+
+                    async def request(i, tokens=tokens):
+                        return bool(verify_token(tokens[i]))
+                elif name == "verify_token_cached":
+                    async def request(i):
+                        return bool(verify_token(token))
+                elif name in product_queries:
+                    async def request(i, url=product_queries[name]):
+                        return (await client.get(url)).status_code == 200
+                else:
+                    continue
+                concurrency = 1 if name.startswith("verify_token") else args.concurrency
+                results[name] = await run_scenario(request, args.requests, concurrency)
+                print(f"  {name:<22} {results[name]['throughput_rps']:>9} req/s  p99 {results[name]['p99_ms']} ms", file=sys.stderr)
+    return results
+
+# ==============================================================
+#  Orchestrator
+# ==============================================================
+
+def run_worker(service: str, args) -> dict:
+    """Chạy một service trong process con, đọc kết quả JSON"""
+    with tempfile.NamedTemporaryFile("r", suffix=".json", delete=False) as f:
+        result_path = f.name
+    try:
+        command = [
+            sys.executable, os.path.abspath(__file__),
+            "--worker", service, "--worker-output", result_path,
+            "--requests", str(args.requests), "--concurrency", str(args.concurrency),
+            "--users", str(args.users), "--products", str(args.products),
+            "--scenarios", *args.scenarios,
+        ]
+        if args.product_cache:
+            command.append("--product-cache")
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+        with open(result_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    finally:
+        os.remove(result_path)
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results: dict, baseline_path: str, max_regression: float) -> bool:
+    """In chênh lệch so với baseline; trả về True nếu có scenario chậm hơn ngưỡng"""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    regressed = False
+    print(f"\n{'scenario':<24}{'rps':>12}{'Δ rps':>10}{'p99 ms':>10}{'Δ p99':>10}")
+    for name, current in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        rps_delta = current["throughput_rps"] / before["throughput_rps"] - 1
+        p99_delta = current["p99_ms"] / before["p99_ms"] - 1 if before["p99_ms"] else 0.0
+        flag = ""
+        if rps_delta < -max_regression or p99_delta > max_regression:
+            flag = "  REGRESSION"
+            regressed = True
+        print(f"{name:<24}{current['throughput_rps']:>12}{rps_delta:>+10.1%}{current['p99_ms']:>10}{p99_delta:>+10.1%}{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="Số request mỗi scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--scenarios", nargs="+", choices=AUTH_SCENARIOS + RESOURCE_SCENARIOS,
+                        default=list(AUTH_SCENARIOS + RESOURCE_SCENARIOS))
+    parser.add_argument("--product-cache", action="store_true", help="Bật response cache của /api/products")
+    parser.add_argument("--output", default=os.path.join(ROOT_DIR, "benchmarks", "results", "latest.json"))
+    parser.add_argument("--compare", help="File kết quả baseline để so sánh")
+    parser.add_argument("--max-regression", type=float, default=0.10, help="Ngưỡng chậm hơn baseline (0.10 = 10%%)")
+    parser.add_argument("--worker", choices=("auth", "resource"), help=argparse.SUPPRESS)
+    parser.add_argument("--worker-output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        bench = bench_auth if args.worker == "auth" else bench_resource
+        with tempfile.TemporaryDirectory() as tmp:
+            results = asyncio.run(bench(args, tmp))
+        with open(args.worker_output, "w", encoding="utf-8") as f:
+            json.dump(results, f)
+        return
+
+    results = {}
+    if any(name in AUTH_SCENARIOS for name in args.scenarios):
+        print("auth_service:", file=sys.stderr)
+        results.update(run_worker("auth", args))
+    if any(name in RESOURCE_SCENARIOS for name in args.scenarios):
+        print("resource_service:", file=sys.stderr)
+        results.update(run_worker("resource", args))
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "users": args.users,
+            "products": args.products,
+            "product_cache": args.product_cache,
+        },
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"results written to {args.output}", file=sys.stderr)
+
+    if args.compare and compare(results, args.compare, args.max_regression):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Micro-benchmark: ký JWT bằng PEM string (jose, parse lại key mỗi lần)
+so với TokenSigner (key object đã parse sẵn)
+
+Chạy từ thư mục gốc của project:
+    python benchmarks/bench_token_signing.py --iterations 2000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "auth_service"))
+
+
+def write_temp_private_key(directory: str) -> str:
+    """Tạo RSA 2048 private key tạm để benchmark"""
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    path = os.path.join(directory, "private.pem")
+    with open(path, "wb") as f:
+        f.write(private_key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption(),
+        ))
+    return path
+
+
+def measure(fn, iterations: int) -> float:
+    """Trả về thời gian trung bình (giây) cho mỗi lần gọi fn"""
+    fn()  # warm-up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--logins-per-second", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["PRIVATE_KEY_PATH"] = write_temp_private_key(tmp)
+
+        from jose import jwt as jose_jwt
+        from app.core.security import load_private_key
+        from app.core.signer import get_signer
+
+        pem = load_private_key()
+        signer = get_signer()
+        claims = {
+            "sub": "1",
+            "username": "admin",
+            "email": "admin@example.com",
+            "exp": int(time.time()) + 1800,
+            "iat": int(time.time()),
+            "iss": "auth_service",
+        }
+
+        pem_cost = measure(lambda: jose_jwt.encode(claims, pem, algorithm="RS256"), args.iterations)
+        signer_cost = measure(lambda: signer.sign(claims), args.iterations)
+
+    saving = pem_cost - signer_cost
+    print(f"iterations              : {args.iterations}")
+    print(f"jose.encode(PEM)        : {pem_cost * 1e6:9.1f} us/token  ({1 / pem_cost:8.0f} tokens/s)")
+    print(f"TokenSigner.sign        : {signer_cost * 1e6:9.1f} us/token  ({1 / signer_cost:8.0f} tokens/s)")
+    print(f"saving per token        : {saving * 1e6:9.1f} us ({saving / pem_cost * 100:.1f}%)")
+    print(f"CPU saved @ {args.logins_per_second} logins/s: {saving * args.logins_per_second:.3f} core-seconds per second")
+
+
+if __name__ == "__main__":
+    main()
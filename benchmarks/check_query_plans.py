@@ -0,0 +1,193 @@
+"""
+Kiểm tra EXPLAIN QUERY PLAN của các query nóng trên schema tạo bởi Alembic migrations:
+mỗi query phải dùng đúng index mong đợi và không sắp xếp lại bằng temp B-tree.
+Thoát với mã 1 nếu có query không khớp (dùng được trong CI).
+
+Chạy từ thư mục gốc của project:
+    python benchmarks/check_query_plans.py
+
+Mỗi service chạy trong một process con riêng (hai service cùng dùng package `app`).
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVICES = ("auth", "resource")
+
+# ==============================================================
+#  Đọc query plan
+# ==============================================================
+
+def query_plan(connection, statement) -> list:
+    """Các dòng (detail) của EXPLAIN QUERY PLAN cho một câu lệnh SQLAlchemy"""
+    compiled = statement.compile(dialect=connection.dialect)
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    rows = connection.exec_driver_sql("EXPLAIN QUERY PLAN " + compiled.string, params).fetchall()
+    return [row[3] for row in rows]
+
+
+def check(name: str, plan: list, expected: tuple, forbidden: tuple = ("USE TEMP B-TREE",)) -> bool:
+    """expected: chuỗi phải xuất hiện trong plan; forbidden: chuỗi không được xuất hiện"""
+    text = " | ".join(plan)
+    ok = all(item in text for item in expected) and not any(item in text for item in forbidden)
+    print(f"  [{'OK' if ok else 'FAIL'}] {name:<24} {text}")
+    if not ok:
+        print(f"         expected {expected}, forbidden {forbidden}")
+    return ok
+
+# ==============================================================
+#  Auth Service
+# ==============================================================
+
+def check_auth() -> bool:
+    from sqlalchemy import delete, insert, select, text, update
+    from app.core.user_cache import AUTH_USER_COLUMNS
+    from app.db.database import engine, upgrade_database
+    from app.models.refresh_token import RefreshToken
+    from app.models.revoked_token import RevokedToken
+    from app.models.user import User
+
+    upgrade_database()
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"username": f"user{i}", "email": f"user{i}@example.com", "hashed_password": "x"}
+            for i in range(5000)
+        ])
+        conn.execute(text("ANALYZE"))
+
+    now = datetime.utcnow()
+    checks = [
+        ("login_by_username", select(*AUTH_USER_COLUMNS).where(User.username == "user42"),
+         ("ix_users_username (username=?)",)),
+        ("login_by_email", select(*AUTH_USER_COLUMNS).where(User.email == "user42@example.com"),
+         ("ix_users_email (email=?)",)),
+        ("refresh_lookup", select(RefreshToken).where(RefreshToken.token_hash == "0" * 64),
+         ("ix_refresh_tokens_token_hash",)),
+        ("refresh_family_revoke", update(RefreshToken)
+         .where(RefreshToken.family_id == "f", RefreshToken.revoked_at.is_(None))
+         .values(revoked_at=now),
+         ("ix_refresh_tokens_family_id",)),
+        ("refresh_prune", delete(RefreshToken).where(RefreshToken.expires_at < now),
+         ("ix_refresh_tokens_expires_at",)),
+        ("revocation_feed", select(RevokedToken).where(RevokedToken.id > 10).order_by(RevokedToken.id).limit(1000),
+         ("INTEGER PRIMARY KEY",)),
+        ("revocation_prune", delete(RevokedToken).where(RevokedToken.expires_at < now),
+         ("ix_revoked_tokens_expires_at",)),
+    ]
+    with engine.connect() as conn:
+        results = [check(name, query_plan(conn, statement), expected) for name, statement, expected in checks]
+    return all(results)
+
+# ==============================================================
+#  Resource Service
+# ==============================================================
+
+def check_resource() -> bool:
+    from sqlalchemy import func, select, update
+    from bench_product_search import populate
+    from app.api.routes_products import _filtered_query
+    from app.db import search as product_search
+    from app.db.database import SessionLocal, create_tables, engine, update_statistics, upgrade_database
+    from app.models.product import Product
+
+    upgrade_database()  # ANALYZE của migration chạy lúc bảng còn rỗng
+    create_tables()  # FTS5 table + triggers
+    populate(engine, 20000)
+
+    def listing(category=None, search=None):
+        query, _ = _filtered_query(select(Product), category, search)
+        return query
+
+    def count(query):
+        return select(func.count()).select_from(query.subquery())
+
+    checks = [
+        ("list_page", listing().order_by(Product.id).offset(200).limit(21),
+         ("SCAN products",)),
+        ("list_category", listing("Books").order_by(Product.id).offset(200).limit(21),
+         ("ix_products_active_category_id (is_active=? AND category=?)",)),
+        ("list_category_cursor", listing("Books").where(Product.id > 10000).order_by(Product.id).limit(21),
+         ("ix_products_active_category_id (is_active=? AND category=? AND id>?)",)),
+        ("count_all", count(listing()),
+         ("COVERING INDEX ix_products_active_category_id (is_active=?)",)),
+        ("count_category", count(listing("Books")),
+         ("COVERING INDEX ix_products_active_category_id (is_active=? AND category=?)",)),
+        ("stock_decrement", update(Product)
+         .where(Product.id == 42, Product.is_active == True, Product.stock_quantity >= 1)
+         .values(stock_quantity=Product.stock_quantity - 1, version=Product.version + 1),
+         ("INTEGER PRIMARY KEY (rowid=?)",)),
+    ]
+    forbidden = {}
+    if product_search.fts_enabled:
+        # Tìm kiếm luôn duyệt products_fts trước rồi seek products theo rowid, không quét index
+        # của products rồi MATCH từng dòng (planner tự chọn vậy với JOIN thường + sqlite_stat1 cũ)
+        fts_first = ("SCAN products_fts VIRTUAL TABLE INDEX", "SEARCH products USING")
+        checks += [
+            ("search_fts", product_search.order_by_rank(listing(search="zenith phone")).limit(21), fts_first),
+            ("count_search", count(listing(search="zenith phone")), fts_first),
+            ("count_search_category", count(listing("Books", "zenith phone")), fts_first),
+        ]
+        # products chỉ được seek theo id của từng kết quả MATCH, không duyệt theo is_active / category.
+        # Sắp xếp theo bm25 cần temp B-tree, các query khác thì không
+        scan_products = ("(is_active=?)", "(is_active=? AND category=?)")
+        forbidden["search_fts"] = scan_products
+        forbidden["count_search"] = forbidden["count_search_category"] = scan_products + ("USE TEMP B-TREE",)
+
+
+    def run(checks) -> list:
+        with engine.connect() as conn:
+            return [
+                check(name, query_plan(conn, statement), expected, forbidden.get(name, ("USE TEMP B-TREE",)))
+                for name, statement, expected in checks
+            ]
+
+    # Thứ tự bảng của tìm kiếm không được phụ thuộc thống kê: kiểm tra cả với sqlite_stat1 cũ
+    print("  sqlite_stat1 from empty table:")
+    results = run([item for item in checks if item[0] in forbidden])
+    with SessionLocal() as db:
+        update_statistics(db)  # Như sau seed / bulk import
+        db.commit()
+    print("  after update_statistics:")
+    results += run(checks)
+    return all(results)
+
+# ==============================================================
+#  Orchestrator
+# ==============================================================
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--services", nargs="+", choices=SERVICES, default=list(SERVICES))
+    parser.add_argument("--worker", choices=SERVICES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        sys.path.insert(0, os.path.join(ROOT_DIR, f"{args.worker}_service"))
+        ok = check_auth() if args.worker == "auth" else check_resource()
+        sys.exit(0 if ok else 1)
+
+    failed = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for service in args.services:
+            print(f"{service}_service:")
+            env = {**os.environ, "DATABASE_URL": f"sqlite:///{os.path.join(tmp, service + '.db')}"}
+            result = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--worker", service],
+                cwd=os.path.join(ROOT_DIR, f"{service}_service"),
+                env=env,
+            )
+            if result.returncode != 0:
+                failed.append(service)
+    if failed:
+        print(f"query plan check failed: {', '.join(failed)}")
+        sys.exit(1)
+    print("all query plans OK")
+
+
+if __name__ == "__main__":
+    main()
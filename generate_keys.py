@@ -1,21 +1,86 @@
 """
-Script to generate RSA key pair for JWT authentication
+Script to generate key pair for JWT authentication (RS256 / ES256 / EdDSA)
 Tạo private key cho auth_service (để ký token) và public key cho resource_service (để verify token)
 """
 
 from cryptography.hazmat.primitives import serialization
-from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
 from cryptography.hazmat.backends import default_backend
+from datetime import datetime
+from jwt.algorithms import ECAlgorithm, OKPAlgorithm, RSAAlgorithm
+import argparse
+import base64
+import glob
+import hashlib
+import json
 import os
 
-def generate_rsa_keypair():
-    """Generate RSA key pair"""
-    # Generate private key
-    private_key = rsa.generate_private_key(
+PRIVATE_KEY_PATH = "auth_service/rsa_keys/private.pem"
+RETIRED_KEYS_DIR = "auth_service/rsa_keys/retired"
+PUBLIC_KEY_PATH = "resource_service/rsa_keys/public.pem"
+JWKS_PATH = "resource_service/rsa_keys/jwks.json"
+
+SUPPORTED_ALGORITHMS = ("RS256", "ES256", "EdDSA")
+
+# Các trường dùng để tính thumbprint (RFC 7638) theo loại key
+THUMBPRINT_MEMBERS = {
+    "RSA": ("e", "kty", "n"),
+    "EC": ("crv", "kty", "x", "y"),
+    "OKP": ("crv", "kty", "x"),
+}
+
+def generate_private_key(algorithm):
+    """Tạo private key theo thuật toán: RSA 2048, ECDSA P-256 hoặc Ed25519"""
+    if algorithm == "ES256":
+        return ec.generate_private_key(ec.SECP256R1(), backend=default_backend())
+    if algorithm == "EdDSA":
+        return ed25519.Ed25519PrivateKey.generate()
+    return rsa.generate_private_key(
         public_exponent=65537,
         key_size=2048,
         backend=default_backend()
     )
+
+def public_jwk(public_key):
+    """Chuyển public key thành JWK, kid = JWK thumbprint (RFC 7638) giống auth_service"""
+    if isinstance(public_key, ec.EllipticCurvePublicKey):
+        algorithm, jwk = "ES256", ECAlgorithm.to_jwk(public_key, as_dict=True)
+    elif isinstance(public_key, ed25519.Ed25519PublicKey):
+        algorithm, jwk = "EdDSA", OKPAlgorithm.to_jwk(public_key, as_dict=True)
+    else:
+        algorithm, jwk = "RS256", RSAAlgorithm.to_jwk(public_key, as_dict=True)
+    jwk.pop("key_ops", None)
+    members = {name: jwk[name] for name in THUMBPRINT_MEMBERS[jwk["kty"]]}
+    canonical = json.dumps(members, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    kid = base64.urlsafe_b64encode(hashlib.sha256(canonical).digest()).decode("ascii").rstrip("=")
+    jwk.update({"kid": kid, "alg": algorithm, "use": "sig"})
+    return jwk
+
+def retire_current_key():
+    """Chuyển private key hiện tại vào thư mục retired (key cũ vẫn verify được token cũ)"""
+    if not os.path.exists(PRIVATE_KEY_PATH):
+        return None
+    os.makedirs(RETIRED_KEYS_DIR, exist_ok=True)
+    retired_path = os.path.join(RETIRED_KEYS_DIR, f"private-{datetime.now().strftime('%Y%m%d%H%M%S')}.pem")
+    os.replace(PRIVATE_KEY_PATH, retired_path)
+    return retired_path
+
+def write_jwks(current_public_key):
+    """Ghi JWKS (key hiện tại + key đã retire) cho resource_service"""
+    keys = [public_jwk(current_public_key)]
+    for path in sorted(glob.glob(os.path.join(RETIRED_KEYS_DIR, "*.pem"))):
+        with open(path, "rb") as f:
+            retired_key = serialization.load_pem_private_key(f.read(), password=None)
+        keys.append(public_jwk(retired_key.public_key()))
+    with open(JWKS_PATH, "w", encoding="utf-8") as f:
+        json.dump({"keys": keys}, f, indent=2)
+
+def generate_keypair(algorithm="RS256", rotate=False):
+    """Generate key pair (RSA / EC / Ed25519)"""
+    retired_path = retire_current_key() if rotate else None
+    
+    # Generate private key
+    private_key = generate_private_key(algorithm)
     
     # Get public key
     public_key = private_key.public_key()
@@ -38,16 +103,37 @@ def generate_rsa_keypair():
     os.makedirs("resource_service/rsa_keys", exist_ok=True)
     
     # Write private key to auth_service
-    with open("auth_service/rsa_keys/private.pem", "wb") as f:
+    with open(PRIVATE_KEY_PATH, "wb") as f:
         f.write(private_pem)
     
     # Write public key to resource_service
-    with open("resource_service/rsa_keys/public.pem", "wb") as f:
+    with open(PUBLIC_KEY_PATH, "wb") as f:
         f.write(public_pem)
     
-    print("RSA key pair generated successfully!")
-    print("Private key: auth_service/rsa_keys/private.pem")
-    print("Public key: resource_service/rsa_keys/public.pem")
+    # Write JWKS to resource_service (chọn key theo kid)
+    write_jwks(public_key)
+    
+    print(f"{algorithm} key pair generated successfully!")
+    print(f"Private key: {PRIVATE_KEY_PATH}")
+    print(f"Public key: {PUBLIC_KEY_PATH}")
+    print(f"JWKS: {JWKS_PATH}")
+    if retired_path:
+        print(f"Previous private key retired to: {retired_path}")
+    if algorithm != "RS256":
+        print(f"Nhớ đặt ALGORITHM={algorithm} cho auth_service (và resource_service nếu còn token không có kid)")
 
 if __name__ == "__main__":
-    generate_rsa_keypair()
+    parser = argparse.ArgumentParser(description="Generate key pair for JWT authentication")
+    parser.add_argument(
+        "--algorithm",
+        choices=SUPPORTED_ALGORITHMS,
+        default="RS256",
+        help="RS256 (RSA 2048), ES256 (ECDSA P-256) hoặc EdDSA (Ed25519)"
+    )
+    parser.add_argument(
+        "--rotate",
+        action="store_true",
+        help="Giữ key hiện tại trong auth_service/rsa_keys/retired để token cũ vẫn hợp lệ"
+    )
+    args = parser.parse_args()
+    generate_keypair(algorithm=args.algorithm, rotate=args.rotate)
@@ -1,27 +1,95 @@
 """
 Product API routes
-Endpoints: /products (cần JWT authentication)
+Endpoints: /products (cần JWT authentication), ghi sản phẩm (admin), trừ tồn kho
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from typing import List, Optional
+import base64
+import json
 
-from app.core.security import get_current_user
-from app.schemas.product import ProductResponse, ProductListResponse
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, Optional
+
+from app.core.cache import etag_matches, product_cache, read_data_version
+from app.core.metrics import stage_timer
+from app.core.security import get_current_user, require_admin
+from app.core.serialization import dumps
+from app.schemas.product import (
+    ProductCreate,
+    ProductImportReport,
+    ProductListResponse,
+    ProductResponse,
+    ProductUpdate,
+    StockDecrement,
+    StockUpdateResponse,
+)
 from app.models.product import Product
+from app.db.bulk_import import import_stream, iter_text_lines
 from app.db.database import get_db
+from app.db.export import EXPORT_COLUMNS, iter_products_ndjson
+from app.db.search import apply_search, order_by_rank
 
 router = APIRouter()
 
+# ==============================================================
+#  Keyset (cursor) pagination helpers
+# ==============================================================
+
+def _encode_cursor(last_id: int) -> str:
+    """Tạo cursor opaque từ id của sản phẩm cuối cùng trong trang"""
+    raw = json.dumps({"id": last_id}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def _decode_cursor(cursor: str) -> int:
+    """Giải mã cursor, trả về id của sản phẩm cuối cùng của trang trước"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        last_id = data["id"]
+        # bool là subclass của int: JSON true/false không phải id hợp lệ
+        if not isinstance(last_id, int) or isinstance(last_id, bool):
+            raise ValueError("id phải là số nguyên")
+        return last_id
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor không hợp lệ"
+        )
+
+def _filtered_query(query, category: Optional[str], search: Optional[str]):
+    """Áp dụng các bộ lọc chung của danh sách sản phẩm
+    
+    Returns:
+        (query, ranked): ranked=True nếu dùng full-text search có xếp hạng
+    """
+    # Query base - chỉ lấy sản phẩm active
+    query = query.where(Product.is_active == True)
+    
+    # Lọc theo danh mục nếu có
+    if category:
+        query = query.where(Product.category == category)
+    
+    # Tìm kiếm full-text (FTS5) theo tên/mô tả nếu có
+    ranked = False
+    if search:
+        query, ranked = apply_search(query, search)
+    
+    return query, ranked
+
 @router.get("/products", response_model=ProductListResponse)
 async def get_products(
+    request: Request,
     page: int = Query(1, ge=1, description="Số trang"),
     size: int = Query(10, ge=1, le=100, description="Số sản phẩm mỗi trang"),
     category: Optional[str] = Query(None, description="Lọc theo danh mục"),
     search: Optional[str] = Query(None, description="Tìm kiếm theo tên"),
+    cursor: Optional[str] = Query(None, description="Cursor trang tiếp theo (lấy từ next_cursor)"),
+    include_total: Optional[bool] = Query(None, description="Có đếm tổng số sản phẩm không"),
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get list of products (requires JWT authentication)
@@ -29,38 +97,311 @@ async def get_products(
     - **page**: Số trang (bắt đầu từ 1)
     - **size**: Số sản phẩm mỗi trang (1-100)
     - **category**: Lọc theo danh mục (optional)
-    - **search**: Tìm kiếm theo tên sản phẩm (optional)
+    - **search**: Tìm kiếm full-text theo tên/mô tả, xếp theo độ liên quan (optional)
+    - **cursor**: Cursor từ `next_cursor` của response trước (optional).
+      Khi có cursor thì bỏ qua `page`, truy vấn theo keyset nên trang sâu vẫn O(size)
+    - **include_total**: Đếm tổng số sản phẩm (mặc định: có với `page`, không với `cursor`)
     
     Yêu cầu: JWT token trong header Authorization
     - Header: `Authorization: Bearer <access_token>`
     
     Response:
     - **products**: Danh sách sản phẩm
-    - **total**: Tổng số sản phẩm
+    - **total**: Tổng số sản phẩm (null nếu không đếm)
     - **page**: Số trang hiện tại
     - **size**: Kích thước trang
+    - **next_cursor**: Cursor cho trang tiếp theo (null nếu hết dữ liệu)
+    
+    Response có header `ETag`; gửi lại qua `If-None-Match` để nhận `304 Not Modified`
     """
-    # Query base - chỉ lấy sản phẩm active
-    query = db.query(Product).filter(Product.is_active == True)
+    if include_total is None:
+        include_total = cursor is None
     
-    # Lọc theo danh mục nếu có
-    if category:
-        query = query.filter(Product.category == category)
+    # Response đã cache cho cùng query và cùng trạng thái bảng products (mọi worker)
+    data_version = await read_data_version(db) if product_cache.enabled else None
+    cache_key = product_cache.make_key(
+        data_version,
+        page=page,
+        size=size,
+        category=category,
+        search=search,
+        cursor=cursor,
+        include_total=include_total,
+    )
+    cached = product_cache.get(cache_key)
+    if cached is None:
+        product_list = await _query_products(db, page, size, category, search, cursor, include_total)
+        with stage_timer("serialization"):
+            body = dumps(product_list)
+        cached = product_cache.set(cache_key, body)
     
-    # Tìm kiếm theo tên nếu có
-    if search:
-        query = query.filter(Product.name.ilike(f"%{search}%"))
+    headers = {"ETag": cached.etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), cached.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
+
+async def _query_products(
+    db: AsyncSession,
+    page: int,
+    size: int,
+    category: Optional[str],
+    search: Optional[str],
+    cursor: Optional[str],
+    include_total: bool
+) -> Dict[str, Any]:
+    """Truy vấn DB và dựng payload theo ProductListResponse
     
-    # Tính tổng số sản phẩm
-    total = query.count()
+    Chỉ select các cột của ProductResponse (không tạo ORM object) và dựng dict trực tiếp
+    từ các row: dữ liệu lấy từ DB nên không cần validate lại bằng pydantic.
+    """
+    query, ranked = _filtered_query(select(*EXPORT_COLUMNS), category, search)
     
-    # Phân trang
-    offset = (page - 1) * size
-    products = query.offset(offset).limit(size).all()
+    # Tính tổng số sản phẩm (chỉ khi cần, vì COUNT phải quét toàn bộ kết quả)
+    total = None
+    if include_total:
+        total = await db.scalar(select(func.count()).select_from(query.subquery()))
     
-    return ProductListResponse(
-        products=products,
-        total=total,
-        page=page,
-        size=size
-    )
\ No newline at end of file
+    # Phân trang: keyset theo id nếu có cursor, ngược lại dùng offset theo page
+    # (kết quả search không dùng cursor được sắp xếp theo độ liên quan)
+    by_rank = ranked and not cursor
+    if cursor:
+        query = query.order_by(Product.id).where(Product.id > _decode_cursor(cursor))
+    elif by_rank:
+        query = order_by_rank(query).offset((page - 1) * size)
+    else:
+        query = query.order_by(Product.id).offset((page - 1) * size)
+    
+    # Lấy dư 1 bản ghi để biết còn trang tiếp theo hay không
+    result = await db.execute(query.limit(size + 1))
+    products = [dict(row) for row in result.mappings()]
+    next_cursor = None
+    if len(products) > size:
+        products = products[:size]
+        # Cursor theo id chỉ có nghĩa khi kết quả được sắp xếp theo id
+        if not by_rank:
+            next_cursor = _encode_cursor(products[-1]["id"])
+    
+    return {
+        "products": products,
+        "total": total,
+        "page": page,
+        "size": size,
+        "next_cursor": next_cursor,
+    }
+
+@router.get("/products/export")
+async def export_products(
+    category: Optional[str] = Query(None, description="Lọc theo danh mục"),
+    search: Optional[str] = Query(None, description="Tìm kiếm theo tên/mô tả"),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Export toàn bộ catalog (đã lọc) dạng NDJSON - mỗi dòng một sản phẩm
+    
+    Dữ liệu được stream từ database theo batch (`EXPORT_BATCH_SIZE`),
+    nên bộ nhớ không phụ thuộc kích thước catalog. Sắp xếp theo `id`.
+    
+    Yêu cầu: JWT token trong header Authorization
+    """
+    query, _ = _filtered_query(select(*EXPORT_COLUMNS), category, search)
+    return StreamingResponse(
+        iter_products_ndjson(query.order_by(Product.id)),
+        media_type="application/x-ndjson"
+    )
+
+@router.post("/products/import", response_model=ProductImportReport)
+async def import_products(
+    request: Request,
+    fmt: Optional[str] = Query(None, alias="format", pattern="^(ndjson|csv)$", description="ndjson hoặc csv"),
+    current_user: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Bulk import sản phẩm (chỉ admin)
+    
+    Body là file NDJSON (mỗi dòng một JSON object) hoặc CSV có header, gửi dạng stream:
+    - `Content-Type: application/x-ndjson` hoặc `text/csv` (hoặc query `format`)
+    - Mỗi dòng được validate theo `ProductCreate`, dòng lỗi bị bỏ qua và ghi vào `errors`
+    
+    Response:
+    - **inserted** / **rejected**: Số dòng đã insert / bị loại
+    - **elapsed_seconds**, **rows_per_second**: Thời gian và throughput
+    - **errors**: Chi tiết lỗi (tối đa BULK_IMPORT_MAX_ERRORS dòng)
+    """
+    if fmt is None:
+        content_type = request.headers.get("content-type", "")
+        fmt = "csv" if "csv" in content_type else "ndjson"
+    
+    try:
+        report = await import_stream(db, iter_text_lines(request.stream()), fmt)
+    except SQLAlchemyError as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Lỗi khi import sản phẩm: {str(e)}"
+        )
+    
+    return report.to_schema()
+
+# ==============================================================
+#  Ghi sản phẩm (optimistic concurrency theo cột version)
+#  Mỗi thao tác là một câu UPDATE có điều kiện, không đọc trước rồi ghi lại
+# ==============================================================
+
+async def _raise_not_found_or_conflict(db: AsyncSession, product_id: int, conflict_detail: str):
+    """UPDATE không khớp dòng nào: 404 nếu sản phẩm không tồn tại, ngược lại 409
+    
+    conflict_detail có thể dùng {version} và {stock_quantity} hiện tại.
+    """
+    current = (await db.execute(
+        select(Product.version, Product.stock_quantity)
+        .where(Product.id == product_id, Product.is_active == True)
+    )).mappings().first()
+    if current is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Không tìm thấy sản phẩm"
+        )
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=conflict_detail.format(**current)
+    )
+
+@router.get("/products/{product_id}", response_model=ProductResponse)
+async def get_product(
+    product_id: int,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get one product (requires JWT authentication)
+    
+    Dùng `version` trong response cho PATCH / DELETE.
+    """
+    row = (await db.execute(
+        select(*EXPORT_COLUMNS).where(Product.id == product_id, Product.is_active == True)
+    )).mappings().first()
+    if row is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Không tìm thấy sản phẩm"
+        )
+    return dict(row)
+
+@router.post("/products", response_model=ProductResponse, status_code=status.HTTP_201_CREATED)
+async def create_product(
+    product_data: ProductCreate,
+    current_user: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Tạo sản phẩm mới (chỉ admin)
+    
+    Sản phẩm mới có `version` = 1.
+    """
+    new_product = Product(**product_data.model_dump(), is_active=True)
+    
+    db.add(new_product)
+    await db.commit()
+    await db.refresh(new_product)
+    
+    return new_product
+
+@router.patch("/products/{product_id}", response_model=ProductResponse)
+async def update_product(
+    product_id: int,
+    product_data: ProductUpdate,
+    current_user: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Cập nhật một phần sản phẩm (chỉ admin)
+    
+    - Chỉ các field được gửi mới bị thay đổi
+    - **version**: Version đã đọc (GET /products/{id}); nếu sản phẩm đã bị sửa sau đó
+      thì trả `409 Conflict`, client đọc lại rồi thử lại
+    """
+    values = product_data.model_dump(exclude_unset=True, exclude={"version"})
+    if not values:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Không có field nào để cập nhật"
+        )
+    
+    result = await db.execute(
+        update(Product)
+        .where(Product.id == product_id, Product.is_active == True, Product.version == product_data.version)
+        .values(**values, version=Product.version + 1)
+        .returning(*EXPORT_COLUMNS)
+        .execution_options(synchronize_session=False)
+    )
+    row = result.mappings().first()
+    if row is None:
+        await db.rollback()
+        await _raise_not_found_or_conflict(db, product_id, "Sản phẩm đã bị thay đổi (version hiện tại: {version})")
+    product = dict(row)
+    await db.commit()
+    
+    return product
+
+@router.delete("/products/{product_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_product(
+    product_id: int,
+    version: Optional[int] = Query(None, description="Chỉ xóa nếu version khớp"),
+    current_user: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Xóa sản phẩm (chỉ admin)
+    
+    Xóa mềm (`is_active = false`): sản phẩm không còn trong danh sách / tìm kiếm
+    nhưng vẫn giữ trong DB. Có `version` thì chỉ xóa khi version khớp (ngược lại 409).
+    """
+    query = update(Product).where(Product.id == product_id, Product.is_active == True)
+    if version is not None:
+        query = query.where(Product.version == version)
+    result = await db.execute(
+        query.values(is_active=False, version=Product.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        await db.rollback()
+        await _raise_not_found_or_conflict(db, product_id, "Sản phẩm đã bị thay đổi (version hiện tại: {version})")
+    await db.commit()
+    
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+@router.post("/products/{product_id}/stock/decrement", response_model=StockUpdateResponse)
+async def decrement_stock(
+    product_id: int,
+    request_data: StockDecrement,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Trừ tồn kho (checkout) - requires JWT authentication
+    
+    - **quantity**: Số lượng cần trừ (>= 1)
+    
+    Một câu lệnh duy nhất, kiểm tra và trừ cùng lúc:
+    `UPDATE products SET stock_quantity = stock_quantity - :n, version = version + 1
+    WHERE id = :id AND stock_quantity >= :n`
+    nên nhiều request đồng thời không bán quá số hàng và không cần transaction đọc-rồi-ghi.
+    Không đủ hàng -> `409 Conflict`.
+    """
+    quantity = request_data.quantity
+    result = await db.execute(
+        update(Product)
+        .where(Product.id == product_id, Product.is_active == True, Product.stock_quantity >= quantity)
+        .values(stock_quantity=Product.stock_quantity - quantity, version=Product.version + 1)
+        .returning(Product.id, Product.stock_quantity, Product.version)
+        .execution_options(synchronize_session=False)
+    )
+    row = result.mappings().first()
+    if row is None:
+        await db.rollback()
+        await _raise_not_found_or_conflict(db, product_id, "Không đủ hàng trong kho (còn {stock_quantity})")
+    stock = dict(row)
+    await db.commit()
+    
+    return stock
@@ -0,0 +1,48 @@
+"""
+Token verification API routes
+Endpoint cho API gateway: verify nhiều access token trong một request
+"""
+
+import hmac
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, status
+
+from app.core.config import settings
+from app.core.security import verify_tokens_async
+from app.schemas.token import TokenBatchVerifyRequest, TokenBatchVerifyResponse, TokenVerifyResult
+
+router = APIRouter()
+
+def _check_api_key(api_key: Optional[str]) -> None:
+    """Gateway phải gửi đúng TOKEN_VERIFY_API_KEY trong header X-API-Key (key trống -> từ chối mọi request)"""
+    expected = settings.TOKEN_VERIFY_API_KEY
+    if not expected or api_key is None or not hmac.compare_digest(api_key.encode("utf-8"), expected.encode("utf-8")):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Thiếu hoặc sai X-API-Key",
+        )
+
+@router.post("/tokens/verify-batch", response_model=TokenBatchVerifyResponse)
+async def verify_batch(
+    request_data: TokenBatchVerifyRequest,
+    x_api_key: Optional[str] = Header(None)
+):
+    """
+    Verify nhiều access token trong một request (dành cho API gateway)
+    
+    - **tokens**: Danh sách access token (tối đa `TOKEN_VERIFY_BATCH_MAX`)
+    
+    Token trùng nhau chỉ verify một lần, token đã verify trước đó lấy từ cache,
+    phần còn lại verify song song trong thread pool. Kết quả theo đúng thứ tự
+    của `tokens`: `claims` nếu hợp lệ, `error` nếu không (hết hạn, sai chữ ký, bị thu hồi, ...).
+    """
+    _check_api_key(x_api_key)
+    
+    verified = await verify_tokens_async(request_data.tokens)
+    results = [
+        TokenVerifyResult(valid=claims is not None, claims=claims, error=error)
+        for claims, error in verified
+    ]
+    valid = sum(1 for result in results if result.valid)
+    return TokenBatchVerifyResponse(results=results, valid=valid, invalid=len(results) - valid)
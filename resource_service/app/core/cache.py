@@ -0,0 +1,153 @@
+"""
+Response cache for Resource Service
+Cache response đã serialize của danh sách sản phẩm (LRU + TTL), key chứa version của bảng
+products (đổi ngay khi có ghi, kể cả từ worker / process khác), kèm ETag để client nhận 304 Not Modified
+"""
+
+import hashlib
+import json
+from abc import ABC, abstractmethod
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, NamedTuple, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.product import product_changes
+
+# ==============================================================
+#  Cache backends
+# ==============================================================
+
+class CacheBackend(ABC):
+    """Interface cho cache backend (in-memory, Redis, ...)"""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+
+class InMemoryLRUCache(CacheBackend):
+    """LRU cache trong process, giới hạn số entry, mỗi entry có TTL"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def create_cache_backend(name: str) -> CacheBackend:
+    """Tạo cache backend theo tên cấu hình"""
+    if name == "memory":
+        return InMemoryLRUCache(max_entries=settings.PRODUCT_CACHE_MAX_ENTRIES)
+    raise ValueError(f"PRODUCT_CACHE_BACKEND không hợp lệ: {name}")
+
+# ==============================================================
+#  Response cache
+# ==============================================================
+
+class CachedResponse(NamedTuple):
+    """Response body đã serialize + ETag tương ứng"""
+    body: bytes
+    etag: str
+
+
+class ResponseCache:
+    """Cache response theo query đã chuẩn hóa + version dữ liệu (entry cũ hết hạn theo TTL / LRU)"""
+
+    def __init__(self, backend: CacheBackend, ttl: float, enabled: bool = True):
+        self.backend = backend
+        self.ttl = ttl
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, data_version: Optional[int], **params: Any) -> str:
+        """Key = data_version (read_data_version) + query params (bỏ giá trị None, sắp xếp theo tên)"""
+        normalized = {k: v for k, v in sorted(params.items()) if v is not None}
+        return f"v{data_version}:" + json.dumps(normalized, separators=(",", ":"), ensure_ascii=False)
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        if not self.enabled:
+            return None
+        cached = self.backend.get(key)
+        if cached is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return cached
+
+    def set(self, key: str, body: bytes) -> CachedResponse:
+        """Lưu body và trả về CachedResponse (có ETag)"""
+        cached = CachedResponse(body=body, etag=make_etag(body))
+        if self.enabled:
+            self.backend.set(key, cached, self.ttl)
+        return cached
+
+
+async def read_data_version(db: AsyncSession) -> Optional[int]:
+    """Bộ đếm thay đổi của products dùng chung giữa các process (trigger tăng sau mỗi lần ghi)
+
+    Mỗi worker có cache riêng: đưa giá trị này vào key thì mọi lần ghi (worker nào, CLI hay
+    sửa thẳng DB) đều làm key đổi ngay, không cần báo cho từng process.
+    Đọc trong cùng transaction với query danh sách nên cùng snapshot của SQLite (WAL).
+    """
+    return await db.scalar(select(product_changes.c.version).where(product_changes.c.id == 1))
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag từ nội dung response"""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Kiểm tra header If-None-Match có khớp ETag hiện tại không"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+# Global cache instance cho danh sách sản phẩm
+product_cache = ResponseCache(
+    backend=create_cache_backend(settings.PRODUCT_CACHE_BACKEND),
+    ttl=settings.PRODUCT_CACHE_TTL_SECONDS,
+    enabled=settings.PRODUCT_CACHE_ENABLED,
+)
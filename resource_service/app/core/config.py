@@ -4,19 +4,70 @@ Cấu hình database, public key path, và các settings khác
 """
 
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Literal
 
 class Settings(BaseSettings):
     """Application settings"""
     
     # Database settings
     DATABASE_URL: str = "sqlite:///./data/resource_service.db"
+    ASYNC_DATABASE_URL: str = ""  # Để trống = suy ra từ DATABASE_URL (sqlite -> sqlite+aiosqlite)
     
-    # RSA Public Key path (copy từ auth_service)
+    # Connection pool
+    DB_POOL_SIZE: int = 10  # Số connection giữ sẵn (đủ cho các reader đồng thời)
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_PRE_PING: bool = False  # True = thêm 1 round trip mỗi lần checkout connection
+    
+    # SQLite tuning (áp dụng cho mỗi connection mới khi DATABASE_URL là sqlite)
+    SQLITE_JOURNAL_MODE: Literal["WAL", "DELETE", "TRUNCATE", "PERSIST", "MEMORY", "OFF"] = "WAL"
+    SQLITE_SYNCHRONOUS: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = "NORMAL"
+    SQLITE_MMAP_SIZE: int = 268435456  # 256 MB
+    SQLITE_CACHE_SIZE: int = -65536  # Giá trị âm = KiB (64 MB)
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    
+    # Public Key path (copy từ auth_service; RSA / EC P-256 / Ed25519 theo ALGORITHM)
     PUBLIC_KEY_PATH: str = "rsa_keys/public.pem"
     
     # JWT settings
-    ALGORITHM: str = "RS256"
+    ALGORITHM: Literal["RS256", "ES256", "EdDSA"] = "RS256"  # Thuật toán của token không có kid (dùng PUBLIC_KEY_PATH)
+    
+    # JWKS của auth_service (chọn public key theo kid, hỗ trợ rotate key)
+    JWKS_URL: str = ""  # Vd: http://auth_service:8000/.well-known/jwks.json; để trống = đọc JWKS_PATH
+    JWKS_PATH: str = "rsa_keys/jwks.json"  # File JWKS do generate_keys.py tạo
+    JWKS_REFRESH_SECONDS: int = 300  # Chu kỳ refresh ở background (0 = không refresh định kỳ)
+    JWKS_MIN_REFRESH_INTERVAL_SECONDS: int = 30  # Khoảng cách tối thiểu giữa 2 lần refresh sớm khi gặp kid lạ
+    
+    # Deny-list token bị thu hồi (đồng bộ từ auth_service)
+    REVOCATION_FEED_URL: str = ""  # Vd: http://auth_service:8000/auth/revocations; để trống = đọc REVOCATION_FEED_PATH
+    REVOCATION_FEED_PATH: str = "data/revocations.ndjson"  # File NDJSON {"jti", "exp"} (auth_service: REVOCATION_FEED_PATH)
+    REVOCATION_POLL_SECONDS: int = 5  # Chu kỳ đồng bộ (độ trễ tối đa trước khi token bị từ chối)
+    
+    # Verified token cache (0 = tắt cache)
+    TOKEN_CACHE_MAX_SIZE: int = 10000
+    
+    # Batch verify token (POST /api/tokens/verify-batch)
+    TOKEN_VERIFY_BATCH_MAX: int = 1000  # Số token tối đa mỗi request
+    TOKEN_VERIFY_WORKERS: int = 0  # Số thread verify song song (0 = số CPU của máy)
+    TOKEN_VERIFY_API_KEY: str = ""  # Gateway phải gửi header X-API-Key; để trống thì không mở endpoint
+    
+    # Response cache cho danh sách sản phẩm
+    PRODUCT_CACHE_ENABLED: bool = True
+    PRODUCT_CACHE_BACKEND: str = "memory"
+    PRODUCT_CACHE_TTL_SECONDS: int = 60
+    PRODUCT_CACHE_MAX_ENTRIES: int = 1024
+    
+    # Bulk import sản phẩm
+    BULK_IMPORT_CHUNK_SIZE: int = 5000  # Số dòng validate + insert mỗi lần (executemany)
+    BULK_IMPORT_COMMIT_ROWS: int = 50000  # Số dòng mỗi transaction
+    BULK_IMPORT_MAX_ERRORS: int = 100  # Số lỗi chi tiết tối đa trả về trong report
+    
+    # Export NDJSON: số dòng đọc từ cursor mỗi lần
+    EXPORT_BATCH_SIZE: int = 1000
+    
+    # Metrics (GET /metrics, Prometheus text format)
+    METRICS_ENABLED: bool = True
+    METRICS_MULTIPROC_DIR: str = ""  # Thư mục chung để gộp metrics của các worker (gunicorn.conf.py đặt mặc định)
+    METRICS_FLUSH_SECONDS: int = 5  # Chu kỳ mỗi worker ghi snapshot (độ trễ tối đa của metrics worker khác)
     
     # Security settings
     ALLOWED_ORIGINS: List[str] = ["http://localhost:3000", "http://localhost:8000" , "http://127.0.0.1:5500"]
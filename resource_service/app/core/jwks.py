@@ -0,0 +1,161 @@
+"""
+JWKS cache for Resource Service
+Giữ các public key (đã parse) của Auth Service theo `kid`, refresh định kỳ ở background thread.
+Nguồn key: JWKS_URL (HTTP, /.well-known/jwks.json của auth_service) hoặc file JWKS_PATH
+"""
+
+import json
+import os
+import threading
+import time
+import urllib.request
+from typing import Any, Dict, Optional, Tuple
+
+from cryptography.hazmat.primitives import serialization
+from jwt import PyJWK
+from jwt.exceptions import PyJWKError
+
+from app.core.config import settings
+
+# (key object đã parse, thuật toán)
+VerificationKey = Tuple[Any, str]
+
+# Thuật toán mặc định khi JWK không có "alg"
+_DEFAULT_ALGORITHMS = {"RSA": "RS256", "EC": "ES256", "OKP": "EdDSA"}
+
+
+def _resolve_path(relative_path: str) -> Optional[str]:
+    """Tìm file theo cùng thứ tự đường dẫn với load_public_key"""
+    candidates = [
+        relative_path,
+        os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))), relative_path),
+        os.path.join(os.getcwd(), relative_path),
+        os.path.join("/app", relative_path),
+    ]
+    for path in candidates:
+        if os.path.exists(path):
+            return path
+    return None
+
+
+class JWKSCache:
+    """Map kid -> key đã parse; request chỉ đọc dict trong memory, không I/O (refresh ở thread nền)"""
+
+    def __init__(self, url: str = "", path: str = "", refresh_seconds: float = 300, min_refresh_interval: float = 30):
+        self.url = url
+        self.path = path
+        self.refresh_seconds = refresh_seconds
+        self.min_refresh_interval = min_refresh_interval
+        self._keys: Dict[str, VerificationKey] = {}
+        self._default_key: Optional[VerificationKey] = None
+        self._last_refresh = 0.0
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()  # Yêu cầu thread refresh sớm (gặp kid lạ / stop)
+        self._thread: Optional[threading.Thread] = None
+
+    # --- Đọc JWKS ---
+    def _fetch(self) -> Optional[Dict[str, Any]]:
+        if self.url:
+            with urllib.request.urlopen(self.url, timeout=5) as response:
+                return json.loads(response.read().decode("utf-8"))
+        path = _resolve_path(self.path) if self.path else None
+        if path is None:
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _load_default_key(self) -> Optional[VerificationKey]:
+        """Key từ PUBLIC_KEY_PATH, dùng cho token cũ không có kid"""
+        from app.core.security import load_public_key
+        try:
+            public_key = serialization.load_pem_public_key(load_public_key().encode("utf-8"))
+        except FileNotFoundError:
+            return None
+        return public_key, settings.ALGORITHM
+
+    def refresh(self) -> bool:
+        """Tải lại JWKS; lỗi thì giữ nguyên bộ key cũ"""
+        with self._refresh_lock:
+            self._last_refresh = time.monotonic()
+            if self._default_key is None:
+                self._default_key = self._load_default_key()
+            try:
+                data = self._fetch()
+                if data is None:
+                    return False
+                keys = {}
+                for jwk_data in data.get("keys", []):
+                    if "kid" not in jwk_data or jwk_data.get("use", "sig") != "sig":
+                        continue
+                    try:
+                        jwk = PyJWK(jwk_data)
+                    except PyJWKError as e:
+                        print(f"Skipping JWK {jwk_data.get('kid')}: {e}")
+                        continue
+                    keys[jwk.key_id] = (jwk.key, jwk_data.get("alg") or _DEFAULT_ALGORITHMS.get(jwk_data.get("kty")))
+            except (OSError, ValueError, AttributeError) as e:
+                print(f"JWKS refresh failed, keeping {len(self._keys)} cached keys: {e}")
+                return False
+            # Thay cả dict một lần: request đang đọc không thấy trạng thái dở dang
+            self._keys = keys
+            return True
+
+    @property
+    def has_keys(self) -> bool:
+        """Đã có ít nhất một key để verify token (JWKS hoặc PUBLIC_KEY_PATH)"""
+        return bool(self._keys) or self._default_key is not None
+
+    def get_key(self, kid: Optional[str]) -> Optional[VerificationKey]:
+        """Chọn key theo kid (không có kid -> key mặc định từ PUBLIC_KEY_PATH)
+
+        Chỉ đọc memory: kid lạ bị từ chối ngay, thread nền được đánh thức để refresh sớm
+        (có thể auth_service vừa rotate key), các request sau sẽ thấy key mới.
+        """
+        if kid is None:
+            return self._default_key
+        key = self._keys.get(kid)
+        if key is None:
+            self.request_refresh()
+        return key
+
+    def request_refresh(self) -> None:
+        """Đánh thức thread refresh (giới hạn tần suất bởi min_refresh_interval), không chờ"""
+        if time.monotonic() - self._last_refresh >= self.min_refresh_interval:
+            self._wakeup.set()
+
+    # --- Background refresh ---
+    def _run(self) -> None:
+        # refresh_seconds = 0: không refresh định kỳ, chỉ refresh khi được đánh thức
+        timeout = self.refresh_seconds if self.refresh_seconds > 0 else None
+        while True:
+            self._wakeup.wait(timeout)
+            self._wakeup.clear()
+            if self._stop.is_set():
+                return
+            self.refresh()
+
+    def start(self) -> None:
+        """Load key lần đầu (nếu chưa preload trước khi fork) và chạy thread refresh nền"""
+        if not self._keys:
+            self.refresh()
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="jwks-refresh", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+# Global JWKS cache instance
+jwks_cache = JWKSCache(
+    url=settings.JWKS_URL,
+    path=settings.JWKS_PATH,
+    refresh_seconds=settings.JWKS_REFRESH_SECONDS,
+    min_refresh_interval=settings.JWKS_MIN_REFRESH_INTERVAL_SECONDS,
+)
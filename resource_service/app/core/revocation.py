@@ -0,0 +1,129 @@
+"""
+Token deny-list for Resource Service
+Giữ jti của các access token bị thu hồi trong memory (jti -> exp), đồng bộ tăng dần
+ở background từ feed của auth_service, tự bỏ entry khi token hết hạn.
+Nguồn: REVOCATION_FEED_URL (HTTP, GET /auth/revocations?since=) hoặc file NDJSON REVOCATION_FEED_PATH
+"""
+
+import json
+import os
+import threading
+import time
+import urllib.parse
+import urllib.request
+from typing import Dict, Optional
+
+from app.core.config import settings
+
+
+class TokenDenyList:
+    """jti -> exp của token bị thu hồi; kiểm tra chỉ là một lần tra dict"""
+
+    def __init__(self):
+        self._entries: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def add(self, jti: str, exp: int) -> None:
+        if exp > time.time():
+            with self._lock:
+                self._entries[jti] = exp
+
+    def is_revoked(self, jti: Optional[str]) -> bool:
+        return jti is not None and jti in self._entries
+
+    def purge_expired(self) -> int:
+        """Bỏ các token đã hết hạn (verify_token đã từ chối chúng theo exp)"""
+        now = time.time()
+        with self._lock:
+            expired = [jti for jti, exp in self._entries.items() if exp <= now]
+            for jti in expired:
+                del self._entries[jti]
+        return len(expired)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RevocationSync:
+    """Poll feed thu hồi của auth_service và cập nhật deny-list"""
+
+    def __init__(self, deny_list: TokenDenyList, url: str = "", path: str = "", poll_seconds: float = 5):
+        self.deny_list = deny_list
+        self.url = url
+        self.path = path
+        self.poll_seconds = poll_seconds
+        self._last_id = 0  # Cursor của HTTP feed
+        self._offset = 0  # Cursor (byte) của file feed
+        self._sync_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sync_url(self) -> int:
+        added = 0
+        while True:
+            query = urllib.parse.urlencode({"since": self._last_id})
+            with urllib.request.urlopen(f"{self.url}?{query}", timeout=5) as response:
+                feed = json.loads(response.read().decode("utf-8"))
+            for entry in feed["revocations"]:
+                self.deny_list.add(entry["jti"], entry["exp"])
+            added += len(feed["revocations"])
+            if not feed["revocations"] or feed["last_id"] <= self._last_id:
+                return added
+            self._last_id = feed["last_id"]
+
+    def _sync_file(self) -> int:
+        if not os.path.exists(self.path):
+            return 0
+        if os.path.getsize(self.path) < self._offset:
+            self._offset = 0  # File bị tạo lại -> đọc lại từ đầu
+        added = 0
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # Dòng đang được ghi dở, đọc ở lần sau
+                self._offset += len(line)
+                if line.strip():
+                    entry = json.loads(line)
+                    self.deny_list.add(entry["jti"], entry["exp"])
+                    added += 1
+        return added
+
+    def sync(self) -> int:
+        """Lấy các jti mới từ feed, trả về số entry đã thêm"""
+        with self._sync_lock:
+            try:
+                added = self._sync_url() if self.url else self._sync_file() if self.path else 0
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Revocation feed sync failed: {e}")
+                added = 0
+            self.deny_list.purge_expired()
+            return added
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.poll_seconds):
+            self.sync()
+
+    def start(self) -> None:
+        """Đồng bộ lần đầu và chạy thread poll định kỳ"""
+        self.sync()
+        if self._thread is None and self.poll_seconds > 0:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="revocation-sync", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+# Global deny-list và sync instance
+deny_list = TokenDenyList()
+revocation_sync = RevocationSync(
+    deny_list,
+    url=settings.REVOCATION_FEED_URL,
+    path=settings.REVOCATION_FEED_PATH,
+    poll_seconds=settings.REVOCATION_POLL_SECONDS,
+)
@@ -3,27 +3,34 @@ Security utilities for Resource Service
 Verify JWT với RSA public key
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
+import asyncio
 import os
+import threading
 from datetime import datetime
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from jose import jwt, JWTError
+import jwt as pyjwt
 from pydantic import BaseModel
 from app.core.config import settings
+from app.core.jwks import jwks_cache
+from app.core.metrics import stage_timer
+from app.core.revocation import deny_list
+from app.core.token_cache import token_cache
 
 # ==============================================================
 #  MODULE: core/security.py
 #  Mục đích:
-#     - Xác thực token JWT ký bằng RSA (verify_token)
+#     - Xác thực token JWT ký bằng RSA (verify_token), chọn public key theo kid (JWKS)
+#     - Từ chối token đã bị thu hồi (deny-list theo jti)
+#     - Verify nhiều token một lúc (verify_tokens / verify_tokens_async) cho API gateway
 #     - Lấy thông tin user hiện tại từ JWT (get_current_user)
 #  Service: Resource Service
 # ==============================================================
 
-ALGORITHM = "RS256"
-
 # --- Định nghĩa model cho payload ---
 class TokenPayload(BaseModel):
     sub: str  # user id
@@ -32,6 +39,7 @@ class TokenPayload(BaseModel):
     iss: Optional[str] = None
     username: Optional[str] = None
     email: Optional[str] = None
+    is_admin: bool = False
 
 # --- Đọc public key ---
 @lru_cache()
@@ -65,13 +73,35 @@ def load_public_key() -> str:
     except Exception as e:
         raise FileNotFoundError(f"Cannot read public key from {public_key_path}: {str(e)}")
 
+# --- Kiểm tra token bị thu hồi ---
+def _ensure_not_revoked(payload: Dict) -> None:
+    """Tra jti trong deny-list (memory, không query DB)"""
+    if deny_list.is_revoked(payload.get("jti")):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token đã bị thu hồi",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
 # --- Xác thực token ---
 def verify_token(token: str) -> Dict:
     """Giải mã & xác thực JWT ký bằng RSA public key."""
-    public_key = load_public_key()
+    # Token đã verify trước đó và chưa hết hạn -> bỏ qua bước verify RSA
+    cached_payload = token_cache.get(token)
+    if cached_payload is not None:
+        _ensure_not_revoked(cached_payload)
+        return cached_payload
+
     try:
-        payload = jwt.decode(token, public_key, algorithms=[ALGORITHM])
-    except JWTError as e:
+        # Key đã parse sẵn trong JWKS cache, chọn theo kid trong header
+        kid = pyjwt.get_unverified_header(token).get("kid")
+        verification_key = jwks_cache.get_key(kid)
+        if verification_key is None:
+            raise pyjwt.InvalidTokenError(f"Không tìm thấy public key cho kid '{kid}'")
+        key, algorithm = verification_key
+        with stage_timer("jwt_verify"):
+            payload = pyjwt.decode(token, key, algorithms=[algorithm])
+    except pyjwt.InvalidTokenError as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Không thể xác thực token: {str(e)}",
@@ -95,8 +125,90 @@ def verify_token(token: str) -> Dict:
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    _ensure_not_revoked(payload)
+    token_cache.put(token, payload, token_data.exp)
     return payload
 
+# --- Verify nhiều token (batch) ---
+# (claims, None) nếu token hợp lệ, (None, lý do) nếu không
+VerifyResult = Tuple[Optional[Dict], Optional[str]]
+
+_verify_executor: Optional[ThreadPoolExecutor] = None
+_verify_executor_lock = threading.Lock()
+
+def _verify_workers() -> int:
+    return settings.TOKEN_VERIFY_WORKERS or os.cpu_count() or 1
+
+def _get_verify_executor() -> ThreadPoolExecutor:
+    """Thread pool dùng chung cho batch verify (các thread dùng chung key đã parse trong JWKS cache)"""
+    global _verify_executor
+    with _verify_executor_lock:
+        if _verify_executor is None:
+            _verify_executor = ThreadPoolExecutor(
+                max_workers=_verify_workers(),
+                thread_name_prefix="token-verify",
+            )
+        return _verify_executor
+
+def shutdown_verify_executor() -> None:
+    """Dừng thread pool batch verify (gọi khi app shutdown)"""
+    global _verify_executor
+    with _verify_executor_lock:
+        if _verify_executor is not None:
+            _verify_executor.shutdown(wait=True, cancel_futures=True)
+            _verify_executor = None
+
+def _verify_one(token: str) -> VerifyResult:
+    try:
+        return verify_token(token), None
+    except HTTPException as e:
+        return None, e.detail
+
+def _verify_chunk(tokens: List[str]) -> List[VerifyResult]:
+    return [_verify_one(token) for token in tokens]
+
+def _split_batch(tokens: List[str]) -> Tuple[Dict[str, VerifyResult], List[List[str]]]:
+    """Bỏ token trùng, trả lời ngay token đã có trong cache, chia phần còn lại thành các chunk cho pool
+
+    Token chưa cache luôn verify trong pool (kể cả batch nhỏ): verify chữ ký RSA tốn CPU,
+    chạy trên event loop sẽ chặn mọi request khác của worker.
+    """
+    results: Dict[str, VerifyResult] = {}
+    pending: List[str] = []
+    for token in dict.fromkeys(tokens):
+        cached_payload = token_cache.get(token)
+        if cached_payload is None:
+            pending.append(token)
+            continue
+        try:
+            _ensure_not_revoked(cached_payload)
+            results[token] = (cached_payload, None)
+        except HTTPException as e:
+            results[token] = (None, e.detail)
+    
+    if not pending:
+        return results, []
+    chunk_size = -(-len(pending) // _verify_workers())
+    return results, [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+
+def verify_tokens(tokens: List[str]) -> List[VerifyResult]:
+    """Verify nhiều token, trả kết quả theo đúng thứ tự đầu vào (token trùng chỉ verify một lần)"""
+    results, chunks = _split_batch(tokens)
+    for chunk, chunk_results in zip(chunks, _get_verify_executor().map(_verify_chunk, chunks)):
+        results.update(zip(chunk, chunk_results))
+    return [results[token] for token in tokens]
+
+async def verify_tokens_async(tokens: List[str]) -> List[VerifyResult]:
+    """Như verify_tokens nhưng không chặn event loop khi chờ thread pool"""
+    results, chunks = _split_batch(tokens)
+    executor = _get_verify_executor()
+    chunk_results = await asyncio.gather(*(
+        asyncio.wrap_future(executor.submit(_verify_chunk, chunk)) for chunk in chunks
+    ))
+    for chunk, verified in zip(chunks, chunk_results):
+        results.update(zip(chunk, verified))
+    return [results[token] for token in tokens]
+
 # --- Tạo HTTPBearer dependency ---
 security_scheme = HTTPBearer(auto_error=False)
 
@@ -126,4 +238,15 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         "user_id": int(user_id),
         "username": payload.get("username", ""),
         "email": payload.get("email", ""),
-    }
\ No newline at end of file
+        "is_admin": bool(payload.get("is_admin", False)),
+    }
+
+# --- Dependency cho các endpoint chỉ dành cho admin ---
+async def require_admin(current_user: dict = Depends(get_current_user)):
+    """Chỉ cho phép user có claim is_admin=true."""
+    if not current_user.get("is_admin"):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Chỉ admin mới được thực hiện thao tác này",
+        )
+    return current_user
\ No newline at end of file
@@ -0,0 +1,33 @@
+"""
+JSON serialization for Resource Service
+Dùng orjson nếu đã cài (nhanh hơn json chuẩn nhiều lần, tự xử lý datetime),
+ngược lại fallback về json của stdlib với cùng định dạng output
+"""
+
+import json
+from datetime import datetime
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(content: Any) -> bytes:
+    """Serialize dict / list / giá trị cơ bản thành JSON (UTF-8 bytes)"""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=_json_default).encode("utf-8")
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse render bằng dumps() (orjson nếu có)"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,82 @@
+"""
+Verified token cache for Resource Service
+LRU cache (có TTL theo `exp` của token) lưu claims đã verify,
+để các request lặp lại với cùng token không phải verify RSA lần nữa
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from app.core.config import settings
+
+
+class VerifiedTokenCache:
+    """Bounded LRU cache: sha256(token) -> (claims, exp)"""
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[bytes, tuple[Dict, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, token: str) -> Optional[Dict]:
+        """Trả về claims nếu token đã được verify và chưa hết hạn"""
+        if self.max_size <= 0:
+            return None
+
+        key = self._key(token)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            claims, exp = entry
+            if exp <= now:
+                # Token đã hết hạn -> bỏ khỏi cache, để verify_token từ chối như bình thường
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return claims
+
+    def put(self, token: str, claims: Dict, exp: int) -> None:
+        """Lưu claims đã verify cho tới thời điểm exp"""
+        if self.max_size <= 0:
+            return
+
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (claims, exp)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Xóa toàn bộ cache"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Số liệu hit/miss hiện tại"""
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# Global cache instance
+token_cache = VerifiedTokenCache(max_size=settings.TOKEN_CACHE_MAX_SIZE)
@@ -0,0 +1,64 @@
+"""
+Background warm-up for Resource Service
+Load JWKS / public key và deny-list token bị thu hồi sau khi service đã khởi động
+(auth_service chưa chạy cũng không chặn startup). GET /ready chỉ trả 200 khi đã có key
+để verify token và DB trả lời được.
+"""
+
+import asyncio
+import time
+from typing import Optional
+
+from sqlalchemy import text
+
+from app.core.jwks import jwks_cache
+from app.core.revocation import revocation_sync
+from app.db.database import async_engine
+
+
+class WarmupState:
+    """Kết quả warm-up, đọc bởi GET /ready"""
+
+    def __init__(self):
+        self.ready = False
+        self.error: Optional[str] = None
+        self.duration: Optional[float] = None
+
+
+def preload() -> None:
+    """Chạy trong master process trước khi fork worker (gunicorn preload_app)
+    
+    JWKS / public key đã parse nằm trong vùng nhớ dùng chung (copy-on-write) của mọi worker;
+    jwks_cache.start() trong worker không parse lại. Không tạo thread / connection ở đây.
+    """
+    jwks_cache.refresh()
+
+
+async def warm_up(state: WarmupState) -> None:
+    """Load key lần đầu và chạy các thread refresh JWKS / đồng bộ deny-list"""
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(
+            asyncio.to_thread(jwks_cache.start),
+            asyncio.to_thread(revocation_sync.start),
+        )
+    except Exception as e:
+        state.error = f"{type(e).__name__}: {e}"
+        print(f"Warm-up failed: {state.error}")
+        return
+    state.duration = time.perf_counter() - start
+    state.ready = True
+
+
+async def check_database() -> Optional[str]:
+    """SELECT 1 qua async pool; trả về lỗi (hoặc None nếu DB trả lời được)"""
+    try:
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+    return None
+
+
+# Global warm-up state
+warmup_state = WarmupState()
@@ -0,0 +1,250 @@
+"""
+Bulk import sản phẩm (NDJSON / CSV)
+Đọc dữ liệu theo dòng (streaming), validate theo ProductCreate từng chunk và insert
+bằng executemany trong các transaction có kích thước cố định.
+Dùng chung cho endpoint POST /api/products/import và CLI:
+
+    python -m app.db.bulk_import products.ndjson
+    python -m app.db.bulk_import products.csv --format csv
+"""
+
+import argparse
+import codecs
+import csv
+import json
+import time
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.database import update_statistics
+from app.models.product import Product
+from app.schemas.product import ProductCreate, ProductImportError, ProductImportReport
+
+SUPPORTED_FORMATS = ("ndjson", "csv")
+
+class ImportReport:
+    """Thống kê của một lần import"""
+
+    def __init__(self, max_errors: int):
+        self.inserted = 0
+        self.rejected = 0
+        self.errors: List[ProductImportError] = []
+        self.max_errors = max_errors
+        self.elapsed = 0.0
+        self._started = time.perf_counter()
+
+    def add_error(self, line: int, error: str) -> None:
+        self.rejected += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append(ProductImportError(line=line, error=error))
+
+    def finish(self) -> "ImportReport":
+        self.elapsed = time.perf_counter() - self._started
+        return self
+
+    def to_schema(self) -> ProductImportReport:
+        return ProductImportReport(
+            inserted=self.inserted,
+            rejected=self.rejected,
+            elapsed_seconds=round(self.elapsed, 3),
+            rows_per_second=round(self.inserted / self.elapsed, 1) if self.elapsed > 0 else 0.0,
+            errors=self.errors,
+        )
+
+class RecordParser:
+    """Chuyển từng dòng text thành record (dict), hỗ trợ field CSV nhiều dòng"""
+
+    def __init__(self, fmt: str):
+        if fmt not in SUPPORTED_FORMATS:
+            raise ValueError(f"Định dạng không hỗ trợ: {fmt}")
+        self.fmt = fmt
+        self.line_no = 0
+        self._header: Optional[List[str]] = None
+        self._buffer = ""
+        self._buffer_start = 0
+
+    def feed(self, line: str) -> Optional[Tuple[int, Any]]:
+        """Trả về (số dòng, dict) hoặc (số dòng, thông báo lỗi); None nếu chưa đủ một record"""
+        self.line_no += 1
+        line = line.rstrip("\r\n")
+
+        if self.fmt == "ndjson":
+            if not line.strip():
+                return None
+            try:
+                return self.line_no, json.loads(line)
+            except ValueError as e:
+                return self.line_no, f"JSON không hợp lệ: {e}"
+
+        # CSV: gom các dòng cho tới khi dấu nháy kép cân bằng (field chứa xuống dòng)
+        if not self._buffer:
+            if not line.strip():
+                return None
+            self._buffer_start = self.line_no
+            self._buffer = line
+        else:
+            self._buffer += "\n" + line
+        if self._buffer.count('"') % 2:
+            return None
+
+        row = next(csv.reader([self._buffer]))
+        self._buffer = ""
+        if self._header is None:
+            self._header = [column.strip() for column in row]
+            return None
+        if len(row) != len(self._header):
+            return self._buffer_start, f"Số cột không khớp header ({len(row)} != {len(self._header)})"
+        # Ô trống -> dùng giá trị mặc định của schema
+        return self._buffer_start, {key: value for key, value in zip(self._header, row) if value != ""}
+
+    def close(self) -> Optional[Tuple[int, Any]]:
+        """Kết thúc input, báo lỗi nếu còn record CSV dở dang"""
+        if self._buffer:
+            return self._buffer_start, "Field CSV chưa đóng dấu nháy kép"
+        return None
+
+class BulkImporter:
+    """Validate record theo ProductCreate và gom thành các chunk để insert"""
+
+    def __init__(self, fmt: str, chunk_size: int = None, max_errors: int = None):
+        self.parser = RecordParser(fmt)
+        self.chunk_size = chunk_size or settings.BULK_IMPORT_CHUNK_SIZE
+        self.report = ImportReport(max_errors if max_errors is not None else settings.BULK_IMPORT_MAX_ERRORS)
+        self._pending: List[Tuple[int, Any]] = []
+
+    def feed_line(self, line: str) -> Optional[List[Dict[str, Any]]]:
+        """Nhận một dòng input, trả về chunk đã validate khi đủ chunk_size"""
+        parsed = self.parser.feed(line)
+        if parsed is not None:
+            self._pending.append(parsed)
+            if len(self._pending) >= self.chunk_size:
+                return self._validate_pending()
+        return None
+
+    def flush(self) -> List[Dict[str, Any]]:
+        """Validate các record còn lại ở cuối input"""
+        parsed = self.parser.close()
+        if parsed is not None:
+            self._pending.append(parsed)
+        return self._validate_pending()
+
+    def _validate_pending(self) -> List[Dict[str, Any]]:
+        rows = []
+        for line_no, record in self._pending:
+            if isinstance(record, str):
+                self.report.add_error(line_no, record)
+                continue
+            if not isinstance(record, dict):
+                self.report.add_error(line_no, "Mỗi dòng phải là một JSON object")
+                continue
+            try:
+                product = ProductCreate.model_validate(record)
+            except ValidationError as e:
+                self.report.add_error(line_no, "; ".join(
+                    f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in e.errors()
+                ))
+                continue
+            row = product.model_dump()
+            row["is_active"] = True
+            rows.append(row)
+        self._pending = []
+        return rows
+
+# ==============================================================
+#  Ghi vào database
+# ==============================================================
+
+async def iter_text_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Chuyển stream bytes (request body) thành từng dòng text UTF-8"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer
+
+async def import_stream(db: AsyncSession, lines: AsyncIterator[str], fmt: str) -> ImportReport:
+    """Import từ async stream các dòng (dùng cho HTTP endpoint)"""
+    importer = BulkImporter(fmt)
+    uncommitted = 0
+
+    async def write(rows: List[Dict[str, Any]]) -> None:
+        nonlocal uncommitted
+        if not rows:
+            return
+        await db.execute(insert(Product), rows)
+        importer.report.inserted += len(rows)
+        uncommitted += len(rows)
+        if uncommitted >= settings.BULK_IMPORT_COMMIT_ROWS:
+            await db.commit()
+            uncommitted = 0
+
+    async for line in lines:
+        rows = importer.feed_line(line)
+        if rows is not None:
+            await write(rows)
+    await write(importer.flush())
+    if importer.report.inserted:
+        await db.run_sync(update_statistics)
+    await db.commit()
+    return importer.report.finish()
+
+def import_lines(db: Session, lines: Iterable[str], fmt: str, chunk_size: int = None) -> ImportReport:
+    """Import từ iterable các dòng (dùng cho CLI / script)"""
+    importer = BulkImporter(fmt, chunk_size=chunk_size)
+    uncommitted = 0
+
+    def write(rows: List[Dict[str, Any]]) -> None:
+        nonlocal uncommitted
+        if not rows:
+            return
+        db.execute(insert(Product), rows)
+        importer.report.inserted += len(rows)
+        uncommitted += len(rows)
+        if uncommitted >= settings.BULK_IMPORT_COMMIT_ROWS:
+            db.commit()
+            uncommitted = 0
+
+    for line in lines:
+        rows = importer.feed_line(line)
+        if rows is not None:
+            write(rows)
+    write(importer.flush())
+    if importer.report.inserted:
+        update_statistics(db)
+    db.commit()
+    return importer.report.finish()
+
+def main():
+    """CLI entry point"""
+    parser = argparse.ArgumentParser(description="Bulk import sản phẩm từ file NDJSON/CSV")
+    parser.add_argument("path", help="Đường dẫn file NDJSON hoặc CSV")
+    parser.add_argument("--format", choices=SUPPORTED_FORMATS, help="Mặc định suy ra từ phần mở rộng file")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Số dòng mỗi lần insert")
+    args = parser.parse_args()
+
+    fmt = args.format or ("csv" if args.path.lower().endswith(".csv") else "ndjson")
+
+    from app.db.database import SessionLocal, create_tables
+    create_tables()
+
+    db = SessionLocal()
+    try:
+        with open(args.path, "r", encoding="utf-8-sig", newline="") as f:
+            report = import_lines(db, f, fmt, chunk_size=args.chunk_size)
+    finally:
+        db.close()
+
+    print(report.to_schema().model_dump_json(indent=2))
+
+if __name__ == "__main__":
+    main()
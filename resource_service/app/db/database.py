@@ -3,48 +3,153 @@ Database configuration and session management
 Session + init data cho Resource Service
 """
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from app.core.config import settings
+from app.core.metrics import instrument_engine
 import os
 
-# Database engine
+def get_async_database_url() -> str:
+    """URL cho async engine (sqlite:/// -> sqlite+aiosqlite:///)"""
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    if settings.DATABASE_URL.startswith("sqlite:"):
+        return "sqlite+aiosqlite:" + settings.DATABASE_URL[len("sqlite:"):]
+    return settings.DATABASE_URL
+
+def _pool_options(url: str, poolclass) -> dict:
+    """Cấu hình pool; SQLite in-memory giữ pool mặc định (mỗi connection là 1 DB riêng)"""
+    if url.startswith("sqlite") and (":memory:" in url or url.rstrip("/").endswith(":")):
+        return {}
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+    }
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Áp dụng PRAGMA hiệu năng cho mỗi connection SQLite mới
+    
+    WAL cho phép reader chạy song song với writer, synchronous=NORMAL là đủ an toàn với WAL.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.execute(f"PRAGMA cache_size={int(settings.SQLITE_CACHE_SIZE)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+# Database engine (sync - dùng cho create_tables, seed data và các script)
 engine = create_engine(
     settings.DATABASE_URL,
     connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {},
     echo=False,  # Set to True for SQL query logging
-    pool_pre_ping=True  # Verify connections before use
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    **_pool_options(settings.DATABASE_URL, QueuePool)
+)
+
+# Async database engine (dùng cho các route handler async)
+async_engine = create_async_engine(
+    get_async_database_url(),
+    echo=False,  # Set to True for SQL query logging
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    **_pool_options(get_async_database_url(), AsyncAdaptedQueuePool)
 )
 
+if settings.DATABASE_URL.startswith("sqlite"):
+    event.listen(engine, "connect", _set_sqlite_pragmas)
+if get_async_database_url().startswith("sqlite"):
+    event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+
+# Đo thời gian query (stage db_query trong /metrics)
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async session factory
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Base class for models
 Base = declarative_base()
 
-def get_db():
-    """Dependency to get database session"""
-    db = SessionLocal()
-    try:
+async def get_db():
+    """Dependency to get async database session"""
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+# Thư mục của service (chứa alembic.ini và migrations/)
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 def init_db():
-    """Initialize database with tables and seed data"""
-    # Create data directory if it doesn't exist
-    data_dir = os.path.dirname(settings.DATABASE_URL.replace("sqlite:///./", ""))
-    if data_dir and not os.path.exists(data_dir):
-        os.makedirs(data_dir, exist_ok=True)
-    
+    """Initialize database: migrations + seed data (one-shot: python -m app.db.seed)"""
+    upgrade_database()
     create_tables()
     seed_data()
+    with SessionLocal() as db:
+        update_statistics(db)
+        db.commit()
+
+def upgrade_database(revision: str = "head"):
+    """Chạy Alembic migrations tới revision (giống `alembic upgrade head`)"""
+    from alembic import command
+    from alembic.config import Config
+    
+    ensure_data_dir()
+    config = Config(os.path.join(SERVICE_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(SERVICE_DIR, "migrations"))
+    command.upgrade(config, revision)
+
+def update_statistics(db: Session):
+    """Cập nhật sqlite_stat1 sau khi ghi nhiều dòng (seed, bulk import)
+    
+    Planner chọn index theo thống kê: thống kê cũ (vd ANALYZE của migration lúc bảng còn rỗng)
+    làm trang danh sách sort bằng temp B-tree. Quét đủ cả bảng (~0.1s / 1M dòng): thống kê
+    lấy mẫu (analysis_limit) cũng cho plan sai như vậy. Caller commit.
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        db.execute(text("ANALYZE products"))
+
+def ensure_data_dir():
+    """Create data directory for SQLite file if it doesn't exist"""
+    url = make_url(settings.DATABASE_URL)
+    if url.get_backend_name() == "sqlite" and url.database and url.database != ":memory:":
+        data_dir = os.path.dirname(url.database)
+        if data_dir:
+            os.makedirs(data_dir, exist_ok=True)
+
+# True khi create_tables đã chạy trong process này (worker gunicorn thừa hưởng từ master)
+_tables_created = False
 
 def create_tables():
-    """Create all tables"""
+    """Create missing tables (idempotent, một lần mỗi process, gọi từ lifespan)
+    
+    Chỉ tạo bảng còn thiếu theo model, không sửa bảng / index đã có:
+    thay đổi schema đi qua migrations (upgrade_database / alembic upgrade head).
+    Dưới gunicorn, master chạy hàm này trước khi fork (on_starting) nên các worker
+    không chạy DDL đồng thời khi khởi động.
+    """
+    global _tables_created
+    if _tables_created:
+        return
+    ensure_data_dir()
     from app.models.product import Base
+    from app.db.search import create_search_index
     Base.metadata.create_all(bind=engine)
+    create_search_index(engine)
+    _tables_created = True
 
 def seed_data():
     """Seed initial product data"""
@@ -0,0 +1,42 @@
+"""
+Export catalog sản phẩm dạng NDJSON
+Đọc bằng server-side cursor (stream + yield_per) và sinh từng batch dòng JSON,
+bộ nhớ không tăng theo kích thước catalog
+"""
+
+from typing import AsyncIterator
+
+from sqlalchemy import Select
+
+from app.core.config import settings
+from app.core.metrics import stage_timer
+from app.core.serialization import dumps
+from app.db.database import AsyncSessionLocal
+from app.models.product import Product
+
+# Các cột xuất ra, cùng thứ tự field với ProductResponse (dùng cho cả export và GET /products)
+EXPORT_COLUMNS = (
+    Product.id,
+    Product.name,
+    Product.description,
+    Product.price,
+    Product.category,
+    Product.stock_quantity,
+    Product.is_active,
+    Product.created_at,
+    Product.updated_at,
+    Product.version,
+)
+
+async def iter_products_ndjson(query: Select) -> AsyncIterator[bytes]:
+    """Stream kết quả query thành NDJSON, mỗi lần yield một batch dòng
+    
+    Dùng session riêng vì response được stream sau khi endpoint đã return.
+    """
+    batch_size = settings.EXPORT_BATCH_SIZE
+    async with AsyncSessionLocal() as session:
+        result = await session.stream(query.execution_options(yield_per=batch_size))
+        async for partition in result.mappings().partitions(batch_size):
+            with stage_timer("serialization"):
+                chunk = b"".join(dumps(dict(row)) + b"\n" for row in partition)
+            yield chunk
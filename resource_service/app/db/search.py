@@ -0,0 +1,135 @@
+"""
+Full-text search cho Product
+SQLite FTS5 virtual table (external content trên bảng products), giữ đồng bộ
+bằng trigger khi insert/update/delete, dùng cho tham số `search` của /api/products
+"""
+
+import re
+from typing import Optional, Tuple
+
+from sqlalchemy import Column, Integer, MetaData, Table, Text, inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.selectable import Join
+
+from app.models.product import Product
+
+FTS_TABLE = "products_fts"
+
+# Bảng ảo chỉ dùng để build query (không nằm trong metadata của models)
+products_fts = Table(
+    FTS_TABLE,
+    MetaData(),
+    Column("rowid", Integer),
+    Column(FTS_TABLE, Text),  # Cột ẩn cùng tên bảng, dùng cho toán tử MATCH
+    Column("name", Text),
+    Column("description", Text),
+    Column("rank", Text),
+)
+
+_FTS_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        name,
+        description,
+        content='products',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON products BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON products BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF name, description ON products BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+]
+
+class FtsFirstJoin(Join):
+    """products_fts JOIN products, luôn duyệt products_fts trước
+
+    SQLite không đổi thứ tự bảng của CROSS JOIN: mỗi kết quả MATCH chỉ cần một lần seek theo
+    rowid của products. Với JOIN thường, planner có thể chọn duyệt index của products rồi chạy
+    MATCH cho từng dòng (vd khi sqlite_stat1 được tạo lúc bảng còn rỗng), chậm hơn hàng nghìn lần.
+    """
+    inherit_cache = True
+
+@compiles(FtsFirstJoin, "sqlite")
+def _compile_fts_first_join(join, compiler, **kw):
+    kw.pop("asfrom", None)
+    left = compiler.process(join.left, asfrom=True, **kw)
+    right = compiler.process(join.right, asfrom=True, **kw)
+    return f"{left} CROSS JOIN {right} ON {compiler.process(join.onclause, **kw)}"
+
+# True khi FTS5 đã sẵn sàng (SQLite có FTS5 và bảng đã được tạo)
+fts_enabled = False
+
+def create_search_index(engine: Engine) -> bool:
+    """Tạo FTS5 table + triggers, rebuild index nếu bảng mới được tạo"""
+    global fts_enabled
+
+    if engine.dialect.name != "sqlite":
+        fts_enabled = False
+        return False
+
+    try:
+        with engine.begin() as conn:
+            existed = inspect(conn).has_table(FTS_TABLE)
+            for ddl in _FTS_DDL:
+                conn.execute(text(ddl))
+            # Xếp hạng bm25, khớp ở tên sản phẩm quan trọng hơn khớp ở mô tả
+            conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) VALUES ('rank', 'bm25(10.0, 1.0)')"))
+            if not existed:
+                # Index các sản phẩm đã có từ trước
+                conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+    except OperationalError as e:
+        # SQLite build không có FTS5 -> dùng ILIKE như cũ
+        print(f"FTS5 not available, falling back to ILIKE search: {e}")
+        fts_enabled = False
+        return False
+
+    fts_enabled = True
+    return True
+
+def build_match_query(search: str) -> Optional[str]:
+    """Chuyển chuỗi tìm kiếm của user thành FTS5 MATCH expression an toàn
+
+    Mỗi từ được quote và tìm theo prefix ("lap" khớp "Laptop"), các từ kết hợp AND.
+    """
+    terms = re.findall(r"\w+", search, flags=re.UNICODE)
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+def apply_search(query, search: str) -> Tuple[object, bool]:
+    """Thêm điều kiện tìm kiếm vào Select (products_fts đứng trước products trong FROM)
+
+    Returns:
+        (query, ranked): ranked=True nếu kết quả có thể sắp xếp theo độ liên quan (bm25)
+    """
+    match = build_match_query(search) if fts_enabled else None
+    if match is None:
+        return query.filter(Product.name.ilike(f"%{search}%")), False
+
+    fts_join = FtsFirstJoin(products_fts, Product.__table__, products_fts.c.rowid == Product.id)
+    query = query.select_from(fts_join).filter(products_fts.c[FTS_TABLE].op("MATCH")(match))
+    return query, True
+
+def order_by_rank(query):
+    """Sắp xếp kết quả FTS theo độ liên quan, hòa thì theo id"""
+    return query.order_by(products_fts.c.rank, Product.id)
@@ -3,16 +3,49 @@ Resource Service - Entry point FastAPI
 Xử lý resource (sản phẩm) với JWT authentication
 """
 
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from app.api.routes_products import router as products_router
+from app.api.routes_tokens import router as tokens_router
 from app.core.config import settings
-from app.db.database import init_db
+from app.core.metrics import CONTENT_TYPE, MetricsMiddleware, multiprocess_metrics
+from app.core.jwks import jwks_cache
+from app.core.revocation import revocation_sync
+from app.core.security import shutdown_verify_executor
+from app.core.serialization import FastJSONResponse
+from app.core.warmup import check_database, warm_up, warmup_state
+from app.db.database import async_engine, create_tables
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Khởi động / tắt service
+    
+    Không làm gì lúc import module: tạo bảng + FTS index khi khởi động (seed data chạy riêng
+    bằng python -m app.db.seed), load JWKS và deny-list ở background (xem GET /ready).
+    """
+    await asyncio.to_thread(create_tables)
+    app.state.warmup = asyncio.create_task(warm_up(warmup_state))
+    multiprocess_metrics.start()
+    
+    yield
+    
+    app.state.warmup.cancel()
+    # Dừng các thread đồng bộ deny-list / refresh JWKS / batch verify / ghi metrics và đóng các connection trong async pool
+    multiprocess_metrics.stop()
+    revocation_sync.stop()
+    jwks_cache.stop()
+    shutdown_verify_executor()
+    await async_engine.dispose()
 
 app = FastAPI(
     title="Resource Service",
     description="Product Resource Service with JWT Authentication",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -24,11 +57,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize database
-init_db()
+# Metrics middleware (latency theo route)
+app.add_middleware(MetricsMiddleware)
 
 # Include routers
 app.include_router(products_router, prefix="/api", tags=["products"])
+# Batch verify chỉ dành cho gateway: không mở endpoint khi chưa cấu hình API key
+if settings.TOKEN_VERIFY_API_KEY:
+    app.include_router(tokens_router, prefix="/api", tags=["tokens"])
 
 @app.get("/")
 async def root():
@@ -37,9 +73,39 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
+    """Health check endpoint (liveness: process còn chạy)"""
     return {"status": "healthy", "service": "resource_service"}
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: 200 khi đã có key verify token và DB trả lời được, ngược lại 503"""
+    if not warmup_state.ready or not jwks_cache.has_keys:
+        if warmup_state.error:
+            status_text = "failed"
+        elif warmup_state.ready:
+            status_text = "no_keys"  # Chưa lấy được JWKS (auth_service chưa chạy?), thread refresh sẽ thử lại
+        else:
+            status_text = "starting"
+        return JSONResponse(
+            status_code=503,
+            content={"status": status_text, "service": "resource_service", "error": warmup_state.error},
+        )
+    
+    db_error = await check_database()
+    if db_error:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "unavailable", "service": "resource_service", "error": db_error},
+        )
+    return {"status": "ready", "service": "resource_service"}
+
+# METRICS_ENABLED=false: không mở endpoint (404)
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        """Prometheus metrics endpoint (tổng của mọi worker khi có METRICS_MULTIPROC_DIR; đọc file nên chạy trong threadpool)"""
+        return Response(content=multiprocess_metrics.render(), media_type=CONTENT_TYPE)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8001)
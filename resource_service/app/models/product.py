@@ -3,7 +3,7 @@ Product model for Resource Service
 ORM Product model với SQLAlchemy
 """
 
-from sqlalchemy import Column, Integer, String, Float, Text, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, Float, Text, DateTime, Boolean, Index, Table, event, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -13,16 +13,53 @@ Base = declarative_base()
 class Product(Base):
     """Product model"""
     __tablename__ = "products"
+    __table_args__ = (
+        # Khớp query của GET /api/products: is_active = 1 [AND category = ?] ORDER BY id
+        # (COUNT chỉ cần đọc index, không đọc bảng)
+        Index("ix_products_active_category_id", "is_active", "category", "id"),
+    )
     
-    id = Column(Integer, primary_key=True, index=True)
-    name = Column(String(100), nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    name = Column(String(100), nullable=False)
     description = Column(Text, nullable=True)
     price = Column(Float, nullable=False)
-    category = Column(String(50), nullable=True, index=True)
+    category = Column(String(50), nullable=True)
     is_active = Column(Boolean, default=True)
     stock_quantity = Column(Integer, default=0)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Optimistic concurrency: tăng 1 mỗi lần sản phẩm thay đổi, UPDATE kèm điều kiện version = ?
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    
+    __mapper_args__ = {"version_id_col": version}
     
     def __repr__(self):
         return f"<Product(id={self.id}, name='{self.name}', price={self.price})>"
+
+# Bộ đếm thay đổi của bảng products (một dòng id = 1), tăng bởi trigger sau mỗi insert / update /
+# delete từ bất kỳ process nào. Response cache của mọi worker đưa giá trị này vào cache key.
+product_changes = Table(
+    "product_changes",
+    Base.metadata,
+    Column("id", Integer, primary_key=True),
+    Column("version", Integer, nullable=False, server_default="0"),
+)
+
+PRODUCT_CHANGES_DDL = [
+    "INSERT OR IGNORE INTO product_changes (id, version) VALUES (1, 0)",
+    *(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS product_changes_{suffix} AFTER {operation} ON products BEGIN
+            UPDATE product_changes SET version = version + 1 WHERE id = 1;
+        END
+        """
+        for suffix, operation in (("ai", "INSERT"), ("au", "UPDATE"), ("ad", "DELETE"))
+    ),
+]
+
+@event.listens_for(Base.metadata, "after_create")
+def _create_product_changes_triggers(target, connection, **kw):
+    """Sau create_all (cả hai bảng đã có): tạo dòng đếm + triggers, idempotent"""
+    if connection.dialect.name == "sqlite":
+        for ddl in PRODUCT_CHANGES_DDL:
+            connection.execute(text(ddl))
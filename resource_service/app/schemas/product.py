@@ -3,7 +3,7 @@ Pydantic schemas for Product Service
 Product schemas và response models
 """
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, field_validator
 from typing import Optional, List
 from datetime import datetime
 
@@ -16,9 +16,35 @@ class ProductBase(BaseModel):
     stock_quantity: int = 0
 
 class ProductCreate(ProductBase):
-    """Product creation schema"""
-    pass
+    """Product creation schema (chỉ validate dữ liệu vào, ProductResponse không kế thừa ràng buộc)"""
+    price: float = Field(..., ge=0)
+    stock_quantity: int = Field(0, ge=0)
 
+class ProductUpdate(BaseModel):
+    """Cập nhật một phần sản phẩm (chỉ các field được gửi)"""
+    name: Optional[str] = None
+    description: Optional[str] = None
+    price: Optional[float] = Field(None, ge=0)
+    category: Optional[str] = None
+    stock_quantity: Optional[int] = Field(None, ge=0)
+    version: int  # Version client đã đọc; khác version hiện tại -> 409 Conflict
+    
+    @field_validator("name", "price", "stock_quantity")
+    @classmethod
+    def not_null(cls, value):
+        if value is None:
+            raise ValueError("Không được để null")
+        return value
+
+class StockDecrement(BaseModel):
+    """Số lượng cần trừ khỏi tồn kho"""
+    quantity: int = Field(..., ge=1)
+
+class StockUpdateResponse(BaseModel):
+    """Tồn kho sau khi cập nhật"""
+    id: int
+    stock_quantity: int
+    version: int
 
 class ProductResponse(ProductBase):
     """Product response schema"""
@@ -26,6 +52,7 @@ class ProductResponse(ProductBase):
     is_active: bool
     created_at: datetime
     updated_at: Optional[datetime] = None
+    version: int
     
     class Config:
         from_attributes = True
@@ -33,9 +60,23 @@ class ProductResponse(ProductBase):
 class ProductListResponse(BaseModel):
     """Product list response schema"""
     products: List[ProductResponse]
-    total: int
+    total: Optional[int] = None  # None khi không yêu cầu đếm tổng (include_total=false)
     page: int
     size: int
+    next_cursor: Optional[str] = None  # Cursor cho trang tiếp theo, None nếu đã hết
+
+class ProductImportError(BaseModel):
+    """Lỗi của một dòng khi bulk import"""
+    line: int
+    error: str
+
+class ProductImportReport(BaseModel):
+    """Kết quả bulk import"""
+    inserted: int
+    rejected: int
+    elapsed_seconds: float
+    rows_per_second: float
+    errors: List[ProductImportError] = []
 
 class UserInfo(BaseModel):
     """User info from JWT token"""
@@ -0,0 +1,25 @@
+"""
+Pydantic schemas for token verification
+Request / response của POST /api/tokens/verify-batch
+"""
+
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+
+class TokenBatchVerifyRequest(BaseModel):
+    """Danh sách access token cần verify"""
+    tokens: List[str] = Field(..., min_length=1, max_length=settings.TOKEN_VERIFY_BATCH_MAX)
+
+class TokenVerifyResult(BaseModel):
+    """Kết quả verify của một token"""
+    valid: bool
+    claims: Optional[Dict[str, Any]] = None  # Payload của token nếu hợp lệ
+    error: Optional[str] = None  # Lý do bị từ chối nếu không hợp lệ
+
+class TokenBatchVerifyResponse(BaseModel):
+    """Kết quả theo đúng thứ tự token trong request"""
+    results: List[TokenVerifyResult]
+    valid: int  # Số token hợp lệ
+    invalid: int  # Số token không hợp lệ
@@ -0,0 +1,56 @@
+"""
+Alembic environment for Resource Service
+Dùng engine của app (cùng DATABASE_URL và PRAGMA SQLite) và metadata của các model
+"""
+
+from logging.config import fileConfig
+
+from alembic import context
+
+from app.core.config import settings
+from app.db.database import engine
+from app.db.search import FTS_TABLE
+from app.models.product import Base
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = Base.metadata
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Bỏ qua bảng FTS5 (và các shadow table của nó) do app.db.search quản lý"""
+    return not (type_ == "table" and name.startswith(FTS_TABLE))
+
+
+def run_migrations_offline() -> None:
+    """Sinh SQL (alembic upgrade head --sql) mà không kết nối DB"""
+    context.configure(
+        url=settings.DATABASE_URL,
+        target_metadata=target_metadata,
+        include_object=include_object,
+        literal_binds=True,
+        render_as_batch=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    # render_as_batch: SQLite không hỗ trợ phần lớn ALTER TABLE
+    with engine.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
+            render_as_batch=True,
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,44 @@
+"""initial schema
+
+Schema như create_all tạo trước khi có migrations. Bảng đã tồn tại (DB cũ) được giữ
+nguyên, nên DB cũ chỉ cần `alembic upgrade head`, không cần stamp.
+Bảng FTS5 products_fts và triggers do app.db.search tạo khi khởi động (cần biết SQLite
+có FTS5 hay không), không nằm trong migrations.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 00:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table("products"):
+        return
+    op.create_table(
+        "products",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=100), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("price", sa.Float(), nullable=False),
+        sa.Column("category", sa.String(length=50), nullable=True),
+        sa.Column("is_active", sa.Boolean(), nullable=True),
+        sa.Column("stock_quantity", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("(CURRENT_TIMESTAMP)"), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_products_id", "products", ["id"])
+    op.create_index("ix_products_name", "products", ["name"])
+    op.create_index("ix_products_category", "products", ["category"])
+
+
+def downgrade() -> None:
+    op.drop_table("products")
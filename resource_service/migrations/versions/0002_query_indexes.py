@@ -0,0 +1,41 @@
+"""query indexes
+
+Thay các index một cột bằng index khớp query của GET /api/products
+(kiểm tra bằng benchmarks/check_query_plans.py):
+- is_active = 1 AND category = ? ORDER BY id [AND id > cursor]: seek thẳng vào
+  (is_active, category, id), không cần sắp xếp lại
+- COUNT(*) của trang đầu: chỉ đọc index (covering), không đọc bảng
+- Không có category: quét theo rowid (đã theo thứ tự id) là tốt nhất
+
+Bỏ ix_products_id (id là rowid), ix_products_name (search dùng FTS5 / LIKE '%...%',
+không dùng được B-tree) và ix_products_category (thay bằng index ghép).
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:00
+"""
+
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_products_active_category_id", "products", ["is_active", "category", "id"], if_not_exists=True
+    )
+    op.drop_index("ix_products_category", table_name="products", if_exists=True)
+    op.drop_index("ix_products_name", table_name="products", if_exists=True)
+    op.drop_index("ix_products_id", table_name="products", if_exists=True)
+    # Cập nhật thống kê để query planner chọn index mới
+    op.execute("ANALYZE products")
+
+
+def downgrade() -> None:
+    op.create_index("ix_products_id", "products", ["id"], if_not_exists=True)
+    op.create_index("ix_products_name", "products", ["name"], if_not_exists=True)
+    op.create_index("ix_products_category", "products", ["category"], if_not_exists=True)
+    op.drop_index("ix_products_active_category_id", table_name="products", if_exists=True)
@@ -0,0 +1,31 @@
+"""product version
+
+Thêm cột products.version cho optimistic concurrency (PATCH / DELETE / trừ tồn kho
+dùng UPDATE có điều kiện, xem app/api/routes_products.py). Sản phẩm đã có nhận version 1.
+DB đã có cột (tạo bằng create_all của model mới) được giữ nguyên.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    columns = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("products")}
+    if "version" in columns:
+        return
+    # SQLite cho phép ADD COLUMN NOT NULL khi có default, không cần copy lại bảng
+    op.add_column("products", sa.Column("version", sa.Integer(), nullable=False, server_default="1"))
+
+
+def downgrade() -> None:
+    # ALTER TABLE DROP COLUMN (SQLite >= 3.35), không dùng batch mode để giữ các trigger FTS5
+    op.drop_column("products", "version")
@@ -0,0 +1,42 @@
+"""product changes counter
+
+Bảng product_changes (một dòng) + triggers tăng version sau mỗi insert / update / delete
+trên products. Response cache của GET /api/products đọc version này vào cache key, nên
+ghi từ worker hoặc process khác cũng làm cache của mọi worker hết hiệu lực ngay.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 00:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+TRIGGERS = (("ai", "INSERT"), ("au", "UPDATE"), ("ad", "DELETE"))
+
+
+def upgrade() -> None:
+    if not sa.inspect(op.get_bind()).has_table("product_changes"):
+        op.create_table(
+            "product_changes",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("version", sa.Integer(), server_default="0", nullable=False),
+            sa.PrimaryKeyConstraint("id"),
+        )
+    op.execute("INSERT OR IGNORE INTO product_changes (id, version) VALUES (1, 0)")
+    for suffix, operation in TRIGGERS:
+        op.execute(
+            f"CREATE TRIGGER IF NOT EXISTS product_changes_{suffix} AFTER {operation} ON products BEGIN "
+            "UPDATE product_changes SET version = version + 1 WHERE id = 1; END"
+        )
+
+
+def downgrade() -> None:
+    for suffix, _ in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS product_changes_{suffix}")
+    op.drop_table("product_changes")